@@ -43,10 +43,32 @@ class Settings:
         self.telegram_api_id = os.getenv("TELEGRAM_API_ID")
         self.telegram_api_hash = os.getenv("TELEGRAM_API_HASH")
         self.telegram_phone_number = os.getenv("TELEGRAM_PHONE_NUMBER")
+        self.telegram_session_mode = os.getenv("TELEGRAM_SESSION_MODE", "file")
 
         # Gemini API settings
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
 
+        # Gemini API requests per day, and the time zone whose midnight resets the quota
+        self.gemini_daily_call_limit = int(os.getenv("GEMINI_DAILY_CALL_LIMIT", "20"))
+        self.gemini_quota_timezone = os.getenv("GEMINI_QUOTA_TIMEZONE", "America/Los_Angeles")
+
+        # Estimated token budget for the messages in one Gemini prompt
+        self.gemini_token_budget = int(os.getenv("GEMINI_TOKEN_BUDGET", "200000"))
+
+        # Estimated tokens per chunk when messages exceed the budget (0 = no chunking)
+        self.gemini_chunk_tokens = int(os.getenv("GEMINI_CHUNK_TOKENS", "100000"))
+
+        # Response cache limits (max age in hours, max total size in MB; 0 MB = disabled)
+        self.gemini_cache_max_age_hours = int(os.getenv("GEMINI_CACHE_MAX_AGE_HOURS", "72"))
+        self.gemini_cache_max_mb = int(os.getenv("GEMINI_CACHE_MAX_MB", "50"))
+
+        # Concurrent Gemini calls (chunked organization) and timeout per call in seconds
+        self.gemini_max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "3"))
+        self.gemini_timeout_seconds = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))
+
+        # Organize messages locally (theme clustering) when Gemini fails or the quota is used up
+        self.gemini_local_fallback = os.getenv("GEMINI_LOCAL_FALLBACK", "true").lower() == "true"
+
         # Google Docs settings
         self.google_credentials_path = os.getenv(
             "GOOGLE_CREDENTIALS_PATH",
@@ -59,6 +81,24 @@ class Settings:
         self.execution_time = os.getenv("EXECUTION_TIME", "09:00")
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
 
+        # Maximum number of chats fetched concurrently
+        self.max_concurrent_chats = int(os.getenv("MAX_CONCURRENT_CHATS", "5"))
+
+        # Look-back window for a chat's first fetch ("24h", "7d" or an ISO date)
+        self.initial_fetch_window = os.getenv("INITIAL_FETCH_WINDOW", "24h")
+
+        # How long cached sender names are reused before being refreshed (hours)
+        self.sender_cache_ttl_hours = int(os.getenv("SENDER_CACHE_TTL_HOURS", "24"))
+
+        # Maximum number of messages per chat fetched by --listen on start
+        self.listener_catchup_limit = int(os.getenv("LISTENER_CATCHUP_LIMIT", "1000"))
+
+        # --backfill paging: messages per request, messages between checkpoints,
+        # and pause between requests (seconds)
+        self.backfill_chunk_size = int(os.getenv("BACKFILL_CHUNK_SIZE", "100"))
+        self.backfill_checkpoint_every = int(os.getenv("BACKFILL_CHECKPOINT_EVERY", "500"))
+        self.backfill_pacing_seconds = float(os.getenv("BACKFILL_PACING_SECONDS", "1.0"))
+
         # Markdown backup retention (days)
         self.markdown_backup_retention_days = int(
             os.getenv("MARKDOWN_BACKUP_RETENTION_DAYS", "30")
@@ -74,6 +114,41 @@ class Settings:
         """Get list of enabled chats only."""
         return [chat for chat in self.target_chats if chat.get("enabled", False)]
 
+    @property
+    def telegram_accounts(self) -> List[Dict]:
+        """
+        Get Telegram accounts used for fetching.
+
+        Accounts are listed under "accounts" in the YAML configuration, each
+        reading its credentials from environment variables with its own
+        env_prefix (default: TELEGRAM_). Without an "accounts" section a
+        single "default" account uses TELEGRAM_* and the original session.
+        """
+        accounts = self.yaml_config.get("accounts") or [{"name": "default"}]
+
+        resolved = []
+        for account in accounts:
+            name = account["name"]
+            prefix = account.get("env_prefix", "TELEGRAM_")
+            default_session = (
+                "telegram_session" if prefix == "TELEGRAM_" else f"telegram_session_{name}"
+            )
+            resolved.append({
+                "name": name,
+                "env_prefix": prefix,
+                "api_id": os.getenv(f"{prefix}API_ID"),
+                "api_hash": os.getenv(f"{prefix}API_HASH"),
+                "phone_number": os.getenv(f"{prefix}PHONE_NUMBER"),
+                "session_name": account.get("session_name", default_session),
+            })
+
+        return resolved
+
+    @property
+    def account_policy(self) -> str:
+        """Get the policy for assigning chats without an explicit account."""
+        return self.yaml_config.get("account_policy", "hash")
+
     @property
     def filters(self) -> Dict:
         """Get filter settings from YAML configuration."""
@@ -103,6 +178,16 @@ class Settings:
             ("GEMINI_API_KEY", self.gemini_api_key),
         ]
 
+        for account in self.telegram_accounts:
+            prefix = account["env_prefix"]
+            if prefix == "TELEGRAM_":
+                continue
+            required_env_vars.extend([
+                (f"{prefix}API_ID", account["api_id"]),
+                (f"{prefix}API_HASH", account["api_hash"]),
+                (f"{prefix}PHONE_NUMBER", account["phone_number"]),
+            ])
+
         missing_vars = [name for name, value in required_env_vars if not value]
 
         if missing_vars:
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark message ingestion offline against a replayed Telegram client.
+
+With --record, the recent history of the enabled chats in
+config/target_chats.yaml is first recorded from live Telegram into a JSON
+file that --recording can replay later.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Settings
+from src.main import collect_messages
+from src.storage.state_manager import StateManager
+from src.telegram_client.client import TelegramClient
+from src.telegram_client.rate_limiter import DEFAULT_RATES, RateLimitedClient
+from src.telegram_client.replay_client import ReplayTelegramClient, record_histories
+
+
+def print_header(text: str):
+    """Print a formatted header."""
+    print()
+    print("=" * 60)
+    print(text)
+    print("=" * 60)
+    print()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Offline ingestion benchmark")
+    parser.add_argument("--chats", type=int, default=100, help="Number of synthetic chats")
+    parser.add_argument("--messages", type=int, default=10000, help="Messages per synthetic chat")
+    parser.add_argument("--recording", help="Replay a JSON recording instead of synthetic chats")
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Record the enabled chats from live Telegram to PATH and exit"
+    )
+    parser.add_argument("--record-limit", type=int, default=1000, help="Messages recorded per chat")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per request")
+    parser.add_argument("--page-size", type=int, default=100, help="Messages per history request")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="Probability of an injected FloodWait")
+    parser.add_argument("--flood-seconds", type=int, default=1, help="Wait carried by injected FloodWaits")
+    parser.add_argument("--concurrency", type=int, default=5, help="Maximum chats processed at once")
+    parser.add_argument("--window", default="48h", help="Initial fetch window")
+    parser.add_argument(
+        "--real-rates",
+        action="store_true",
+        help="Keep the production token bucket rates (default: effectively unlimited)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+async def record(args: argparse.Namespace) -> None:
+    """Record the enabled chats' history from live Telegram for --recording."""
+    settings = Settings()
+    chat_ids = [str(chat["chat_id"]) for chat in settings.enabled_chats]
+
+    telegram_client = TelegramClient(
+        api_id=settings.telegram_api_id,
+        api_hash=settings.telegram_api_hash,
+        phone_number=settings.telegram_phone_number,
+        session_mode=settings.telegram_session_mode
+    )
+
+    started = time.perf_counter()
+    async with telegram_client:
+        await record_histories(telegram_client.client, chat_ids, args.record, limit=args.record_limit)
+
+    print(f"Recorded {len(chat_ids)} chats to {args.record} in {time.perf_counter() - started:.2f}s")
+    print(f"Replay with: python scripts/benchmark_ingestion.py --recording {args.record}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Build the replay client, run collect_messages twice and print timings."""
+    replay_options = dict(
+        latency=args.latency,
+        page_size=args.page_size,
+        flood_rate=args.flood_rate,
+        flood_seconds=args.flood_seconds,
+        seed=args.seed,
+    )
+
+    started = time.perf_counter()
+    if args.recording:
+        replay = ReplayTelegramClient.from_file(args.recording, **replay_options)
+    else:
+        replay = ReplayTelegramClient.synthetic(
+            chats=args.chats,
+            messages_per_chat=args.messages,
+            **replay_options
+        )
+    chat_keys = replay.chat_keys
+    print(f"Loaded {len(chat_keys)} chats in {time.perf_counter() - started:.2f}s")
+
+    rates = None if args.real_rates else {method: (1e9, 10**9) for method in DEFAULT_RATES}
+    api = RateLimitedClient(replay, max_concurrency=args.concurrency, rates=rates)
+    telegram_client = SimpleNamespace(api=api, client=replay)
+    chat_configs = [{"chat_id": key, "name": key, "enabled": True} for key in chat_keys]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_manager = StateManager(str(Path(tmp) / "state.db"))
+
+        # First run fetches the whole window, second run only probes for new messages
+        for label in ("Initial run", "Incremental run"):
+            replay.request_counts.clear()
+            started = time.perf_counter()
+            messages, timings = await collect_messages(
+                chat_configs,
+                telegram_client,
+                state_manager,
+                max_concurrency=args.concurrency,
+                initial_window=args.window
+            )
+            elapsed = time.perf_counter() - started
+
+            print_header(label)
+            print(f"Messages:        {len(messages)}")
+            print(f"Elapsed:         {elapsed:.2f}s")
+            if elapsed > 0:
+                print(f"Throughput:      {len(messages) / elapsed:,.0f} msg/s")
+            if timings:
+                slowest = max(timings, key=timings.get)
+                print(f"Slowest chat:    {slowest} ({timings[slowest]:.2f}s)")
+            print(f"Requests:        {dict(sorted(replay.request_counts.items()))}")
+            print(f"Flood waits:     {api.flood_count} ({api.flood_wait_seconds}s)")
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    if args.record:
+        print_header("Recording Telegram History")
+        asyncio.run(record(args))
+        return
+
+    print_header("Offline Ingestion Benchmark")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
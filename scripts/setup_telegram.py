@@ -5,6 +5,7 @@ This script performs initial authentication with Telegram API and creates a sess
 Run this only once during initial setup.
 """
 
+import argparse
 import asyncio
 import os
 import sys
@@ -18,8 +19,14 @@ from dotenv import load_dotenv
 from telethon import TelegramClient
 
 
-async def setup_telegram():
-    """Perform initial Telegram authentication."""
+async def setup_telegram(env_prefix: str = "TELEGRAM_", session_name: str = "telegram_session"):
+    """
+    Perform initial Telegram authentication.
+
+    Args:
+        env_prefix: Prefix of the account's environment variables
+        session_name: Name of the session file to create
+    """
     print("=" * 60)
     print("Telegram Authentication Setup")
     print("=" * 60)
@@ -32,17 +39,17 @@ async def setup_telegram():
         print(f"   Please create {env_path} based on .env.example")
         print()
         print("   Required variables:")
-        print("   - TELEGRAM_API_ID")
-        print("   - TELEGRAM_API_HASH")
-        print("   - TELEGRAM_PHONE_NUMBER")
+        print(f"   - {env_prefix}API_ID")
+        print(f"   - {env_prefix}API_HASH")
+        print(f"   - {env_prefix}PHONE_NUMBER")
         return False
 
     load_dotenv(env_path)
 
     # Get credentials from environment
-    api_id = os.getenv("TELEGRAM_API_ID")
-    api_hash = os.getenv("TELEGRAM_API_HASH")
-    phone_number = os.getenv("TELEGRAM_PHONE_NUMBER")
+    api_id = os.getenv(f"{env_prefix}API_ID")
+    api_hash = os.getenv(f"{env_prefix}API_HASH")
+    phone_number = os.getenv(f"{env_prefix}PHONE_NUMBER")
 
     # Validate credentials
     if not all([api_id, api_hash, phone_number]):
@@ -50,11 +57,11 @@ async def setup_telegram():
         print()
         print("   Please set the following in your .env file:")
         if not api_id:
-            print("   - TELEGRAM_API_ID")
+            print(f"   - {env_prefix}API_ID")
         if not api_hash:
-            print("   - TELEGRAM_API_HASH")
+            print(f"   - {env_prefix}API_HASH")
         if not phone_number:
-            print("   - TELEGRAM_PHONE_NUMBER")
+            print(f"   - {env_prefix}PHONE_NUMBER")
         return False
 
     print(f"✓ API ID: {api_id}")
@@ -65,7 +72,7 @@ async def setup_telegram():
     # Set up session directory
     session_dir = project_root / "data" / "telegram_session"
     session_dir.mkdir(parents=True, exist_ok=True)
-    session_path = str(session_dir / "telegram_session")
+    session_path = str(session_dir / session_name)
 
     print(f"Session file will be saved to: {session_path}")
     print()
@@ -127,7 +134,20 @@ async def setup_telegram():
 
 def main():
     """Main entry point."""
-    success = asyncio.run(setup_telegram())
+    parser = argparse.ArgumentParser(description="Telegram authentication setup")
+    parser.add_argument(
+        "--env-prefix",
+        default="TELEGRAM_",
+        help="Environment variable prefix of the account (default: TELEGRAM_)"
+    )
+    parser.add_argument(
+        "--session",
+        default="telegram_session",
+        help="Session file name (default: telegram_session)"
+    )
+    args = parser.parse_args()
+
+    success = asyncio.run(setup_telegram(args.env_prefix, args.session))
 
     print()
     print("=" * 60)
@@ -1,33 +1,116 @@
 """Content organization module using Gemini AI for structuring Telegram messages."""
 
+import math
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, List, Optional
 
 from src.ai_processor.gemini_client import GeminiClient
+from src.ai_processor.message_selector import (
+    MessageSelector,
+    build_omitted_appendix,
+    message_tokens,
+)
+from src.ai_processor.prompt_encoder import EncodingReport, encode_messages
+from src.ai_processor.theme_clusterer import build_theme_document
+from src.telegram_client.message_record import MessageRecord
+from src.utils.error_handler import GeminiRateLimitError
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Version of the prompt templates below; bump it when they change so that
+# cached Gemini responses for the old prompts are no longer used
+PROMPT_TEMPLATE_VERSION = "3"
+
+# Calls kept spare for retries when planning chunks (as far as max_calls allows)
+RETRY_HEADROOM_CALLS = 2
+
+# Explains the compact message encoding (see prompt_encoder.encode_messages)
+INPUT_FORMAT_NOTE = """（形式: 先頭の「送信者」は略号と送信者名の対応表です。チャットごとの見出しに最初のメッセージの日時があり、
+各行は「+経過時間(時:分) 送信者略号: 本文」です。「(+ ...)」は同じ内容が投稿された他のチャットです）"""
+
+
+def split_chunks(messages: List[MessageRecord], chunk_count: int) -> List[List[MessageRecord]]:
+    """
+    Split messages into token-balanced chunks, grouped by chat and time.
+
+    Messages are ordered by chat, then by time, and cut into chunk_count
+    consecutive runs of roughly equal estimated tokens, so each chunk holds
+    whole conversations from as few chats as possible.
+
+    Args:
+        messages: Message records
+        chunk_count: Number of chunks to produce
+
+    Returns:
+        List of chunks (at most chunk_count, none empty)
+    """
+    ordered = sorted(messages, key=lambda m: (m.chat_name, m.timestamp))
+    target = sum(message_tokens(m) for m in ordered) / chunk_count
+
+    chunks: List[List[MessageRecord]] = [[]]
+    used = 0
+    for message in ordered:
+        if used >= target and len(chunks) < chunk_count:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(message)
+        used += message_tokens(message)
+
+    return [chunk for chunk in chunks if chunk]
+
 
 class ContentOrganizer:
     """Organizes Telegram messages into structured, thematic Markdown using Gemini AI."""
 
-    def __init__(self, gemini_client: GeminiClient):
+    def __init__(
+        self,
+        gemini_client: GeminiClient,
+        token_budget: Optional[int] = None,
+        chunk_tokens: Optional[int] = None
+    ):
         """
         Initialize ContentOrganizer.
 
         Args:
             gemini_client: Initialized GeminiClient instance
+            token_budget: Estimated token budget for the messages in the prompt
+                (None = send every message)
+            chunk_tokens: Estimated tokens per chunk when messages exceed
+                token_budget (None = no chunking)
         """
         self.gemini_client = gemini_client
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.encoding_report = EncodingReport()
         logger.info("ContentOrganizer initialized")
 
-    def organize_messages(self, messages: List[Dict]) -> str:
+    async def organize_messages(
+        self,
+        messages: List[MessageRecord],
+        max_calls: Optional[int] = None,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> str:
         """
         Organize messages into structured Markdown optimized for NotebookLM.
 
+        Messages that fit the token budget are organized with one call.
+        Larger volumes are organized map-reduce style: token-bounded chunks
+        are summarized concurrently and the partial summaries are merged in
+        a final call. The chunk count is limited so that the whole run stays
+        within max_calls; whatever still does not fit is selected by
+        information score (see MessageSelector) and the rest is listed in
+        an appendix of the document.
+
+        With on_chunk, the final call is streamed: the document text is
+        passed to on_chunk as it is generated, followed by the rest of the
+        document (appendix or fallback), so the chunks add up to the
+        returned string.
+
         Args:
-            messages: List of message dictionaries with text, sender, date, etc.
+            messages: List of message records
+            max_calls: Gemini calls this run may make (None = no limit)
+            on_chunk: Optional callback receiving the document text in order
 
         Returns:
             Structured Markdown string organized by themes
@@ -35,65 +118,306 @@ class ContentOrganizer:
         Raises:
             Exception: If Gemini API call fails
         """
+        if on_chunk is None:
+            content = await self._organize(messages, max_calls, None)
+        else:
+            streamed = 0
+
+            def forward(text: str) -> None:
+                nonlocal streamed
+                streamed += len(text)
+                on_chunk(text)
+
+            content = await self._organize(messages, max_calls, forward)
+            # Streamed text is always the start of the document
+            on_chunk(content[streamed:])
+
+        if self.encoding_report.verbose_tokens:
+            logger.info(f"Prompt message encoding: {self.encoding_report.summary()}")
+        return content
+
+    async def _organize(
+        self,
+        messages: List[MessageRecord],
+        max_calls: Optional[int],
+        on_chunk: Optional[Callable[[str], None]]
+    ) -> str:
+        """Organize messages, streaming the final call to on_chunk if given."""
         if not messages:
             logger.warning("No messages to organize")
             return self._create_empty_document()
 
         logger.info(f"Organizing {len(messages)} messages with Gemini AI")
 
+        total_tokens = sum(message_tokens(message) for message in messages)
+        chunk_count = self.plan_chunks(total_tokens, max_calls)
+
+        if chunk_count > 1:
+            return await self._organize_chunked(messages, total_tokens, chunk_count, on_chunk)
+
+        omitted: List[MessageRecord] = []
+        if self.token_budget:
+            messages, omitted = MessageSelector(self.token_budget).select(messages)
+        appendix = build_omitted_appendix(omitted)
+
         # Build the prompt
         prompt = self._build_prompt(messages)
 
         # Call Gemini API (single call for all messages)
         try:
-            organized_content = self.gemini_client.generate_content(prompt)
+            organized_content = await self._generate(prompt, on_chunk)
 
             if not organized_content:
                 logger.error("Gemini API returned empty content")
-                return self._create_fallback_document(messages)
+                return self._create_fallback_document(messages) + appendix
 
             logger.info("Successfully organized messages")
-            return organized_content
+            return organized_content + appendix
 
         except Exception as e:
             logger.error(f"Failed to organize messages: {e}")
             raise
 
-    def _build_prompt(self, messages: List[Dict]) -> str:
+    def plan_chunks(self, total_tokens: int, max_calls: Optional[int] = None) -> int:
         """
-        Build the prompt for Gemini API.
+        Decide how many chunks to split the messages into.
 
         Args:
-            messages: List of message dictionaries
+            total_tokens: Estimated tokens of all messages
+            max_calls: Gemini calls this run may make (None = no limit); up to
+                RETRY_HEADROOM_CALLS of them are left unplanned for retries
 
         Returns:
-            Formatted prompt string
+            Number of map chunks (1 = single-call mode)
+        """
+        if not self.token_budget or not self.chunk_tokens or total_tokens <= self.token_budget:
+            return 1
+
+        chunk_count = math.ceil(total_tokens / self.chunk_tokens)
+        if max_calls is not None:
+            # One call per chunk plus the final consolidation call, keeping up to
+            # RETRY_HEADROOM_CALLS spare while at least two chunks still fit
+            spare = max(0, min(RETRY_HEADROOM_CALLS, max_calls - 3))
+            chunk_count = min(chunk_count, max_calls - 1 - spare)
+
+        if chunk_count < 2:
+            logger.warning(
+                f"Not enough Gemini quota for chunked organization "
+                f"(max calls: {max_calls}) - using a single call"
+            )
+            return 1
+
+        logger.info(
+            f"Planned {chunk_count} chunk(s) + 1 consolidation call "
+            f"for ~{total_tokens} tokens"
+        )
+        return chunk_count
+
+    async def _organize_chunked(
+        self,
+        messages: List[MessageRecord],
+        total_tokens: int,
+        chunk_count: int,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Organize messages map-reduce style.
+
+        Args:
+            messages: List of message records
+            total_tokens: Estimated tokens of all messages
+            chunk_count: Number of map chunks
+            on_chunk: Optional callback receiving the consolidation as it streams
+
+        Returns:
+            Structured Markdown string organized by themes
         """
-        # Prepare messages text
-        messages_text = []
-        for i, msg in enumerate(messages, 1):
-            chat_name = msg.get("chat_name", "Unknown")
-            sender = msg.get("sender", "Unknown")
-            date = msg.get("date", "")
-            text = msg.get("text", "")
-
-            # Format date for readability
-            try:
-                dt = datetime.fromisoformat(date.replace("Z", "+00:00"))
-                formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-            except:
-                formatted_date = date
-
-            messages_text.append(
-                f"[{i}] {formatted_date} | {chat_name} | {sender}:\n{text}\n"
+        omitted: List[MessageRecord] = []
+        capacity = chunk_count * self.chunk_tokens
+        if total_tokens > capacity:
+            messages, omitted = MessageSelector(capacity).select(messages)
+
+        chunks = split_chunks(messages, chunk_count)
+
+        # Map: partial theme summary per chunk, all chunks concurrently
+        logger.info(
+            f"Organizing {len(chunks)} chunk(s) "
+            f"({', '.join(str(len(chunk)) for chunk in chunks)} messages)"
+        )
+        results = await self.gemini_client.generate_many(
+            [self._build_map_prompt(chunk, index, len(chunks))
+             for index, chunk in enumerate(chunks, 1)],
+            template_version=PROMPT_TEMPLATE_VERSION,
+            return_exceptions=True
+        )
+
+        partials = []
+        covered = 0
+        errors = []
+        for index, (chunk, partial) in enumerate(zip(chunks, results), 1):
+            if isinstance(partial, Exception):
+                logger.warning(f"Gemini API call failed for chunk {index} - omitting it: {partial}")
+                errors.append(partial)
+                omitted.extend(chunk)
+            elif partial:
+                partials.append(partial)
+                covered += len(chunk)
+            else:
+                logger.warning(f"Gemini API returned empty content for chunk {index} - omitting it")
+                omitted.extend(chunk)
+
+        appendix = build_omitted_appendix(omitted)
+        if not partials:
+            if errors:
+                raise errors[0]
+            logger.error("All chunks failed - writing fallback document")
+            return self._create_fallback_document(messages)
+
+        # Reduce: merge the partial summaries
+        logger.info(f"Consolidating {len(partials)} partial summaries")
+        try:
+            organized_content = await self._generate(
+                self._build_reduce_prompt(partials, covered),
+                on_chunk
             )
+        except GeminiRateLimitError as e:
+            logger.error(f"No Gemini quota left for the consolidation: {e}")
+            organized_content = None
+
+        if not organized_content:
+            logger.error("No consolidated content from Gemini - using the partial summaries")
+            organized_content = "\n\n---\n\n".join(partials)
+
+        logger.info("Successfully organized messages")
+        return organized_content + appendix
+
+    async def _generate(
+        self,
+        prompt: str,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """Call Gemini with a prompt built from this module's templates, streaming to on_chunk if given."""
+        if on_chunk:
+            return await self.gemini_client.generate_content_stream(
+                prompt,
+                on_chunk,
+                template_version=PROMPT_TEMPLATE_VERSION
+            )
+        return await self.gemini_client.generate_content_async(
+            prompt,
+            template_version=PROMPT_TEMPLATE_VERSION
+        )
+
+    def _build_prompt(self, messages: List[MessageRecord]) -> str:
+        """
+        Build the prompt for Gemini API.
+
+        Args:
+            messages: List of message records
 
-        all_messages = "\n".join(messages_text)
+        Returns:
+            Formatted prompt string
+        """
+        all_messages = self._encode(messages)
 
         # Build prompt following PLANS.md specification
         prompt = f"""以下のTelegramメッセージをNotebookLMポッドキャスト用に整理してください。
 
+{self._output_format(len(messages))}
+
+---
+
+## 入力メッセージ一覧:
+{INPUT_FORMAT_NOTE}
+
+{all_messages}
+
+---
+
+上記のメッセージを分析し、意味のあるテーマに自動分類して、構造化されたMarkdownを生成してください。
+テーマの数に制限はありません。全ての情報を漏らさず整理してください。
+"""
+
+        return prompt
+
+    def _build_map_prompt(self, messages: List[MessageRecord], index: int, count: int) -> str:
+        """
+        Build the prompt summarizing one chunk (map step).
+
+        Args:
+            messages: Message records of the chunk
+            index: Chunk number (1-based)
+            count: Total number of chunks
+
+        Returns:
+            Formatted prompt string
+        """
+        all_messages = self._encode(messages)
+
+        return f"""以下はTelegramメッセージの一部（パート {index}/{count}）です。
+後で他のパートと統合するため、このパートの内容をテーマごとに整理してください。
+
 要件:
+1. テーマごとに「### テーマ名」の見出しを付け、要点を箇条書きで記述
+2. 数値・固有名詞・URL・日時・送信者・チャット名などのメタデータを残す（送信者は略号ではなく名前で）
+3. 情報を省略しすぎない（統合時の材料になります）
+4. 前置きや結論は不要
+
+## 入力メッセージ一覧:
+{INPUT_FORMAT_NOTE}
+
+{all_messages}
+"""
+
+    def _encode(self, messages: List[MessageRecord]) -> str:
+        """Encode messages compactly, adding them to the encoding report."""
+        encoded = encode_messages(messages)
+        self.encoding_report.add(messages, encoded)
+        return encoded
+
+    def _build_reduce_prompt(self, partials: List[str], message_count: int) -> str:
+        """
+        Build the prompt merging partial summaries (reduce step).
+
+        Args:
+            partials: Partial theme summaries from the map step
+            message_count: Number of messages the partials cover
+
+        Returns:
+            Formatted prompt string
+        """
+        all_partials = "\n\n".join(
+            f"## パート {i}\n\n{partial}" for i, partial in enumerate(partials, 1)
+        )
+
+        return f"""以下は、Telegramメッセージをパートごとにテーマ別整理した結果です。
+これらを1つのドキュメントに統合し、NotebookLMポッドキャスト用に整理してください。
+同じテーマはパートをまたいでまとめ、重複する内容は1つにまとめてください。
+
+{self._output_format(message_count)}
+
+---
+
+## パートごとの整理結果:
+
+{all_partials}
+
+---
+
+上記を統合し、構造化されたMarkdownを生成してください。全ての情報を漏らさず整理してください。
+"""
+
+    def _output_format(self, message_count: int) -> str:
+        """
+        Get the requirements and output format shared by the final prompts.
+
+        Args:
+            message_count: Number of messages shown in the overview
+
+        Returns:
+            Prompt section string
+        """
+        return f"""要件:
 1. 全メッセージをテーマごとに自動グループ化（テーマ数の制限なし）
 2. 各テーマ内で時系列または論理的に整理
 3. メタデータ付き構造化Markdown生成
@@ -104,9 +428,9 @@ class ContentOrganizer:
 # {datetime.now().strftime("%Y年%m月%d日")} Telegramメッセージ整理
 
 ## 📊 概要
-- 処理メッセージ数: {len(messages)}件
+- 処理メッセージ数: {message_count}件
 - データソース: Telegram
-- 収集日時: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+- 収集日: {datetime.now().strftime("%Y-%m-%d")}
 
 ## テーマ別整理
 
@@ -120,21 +444,7 @@ class ContentOrganizer:
 
 ### テーマ2: [自動抽出されたテーマ名]
 
-...
-
----
-
-## 入力メッセージ一覧:
-
-{all_messages}
-
----
-
-上記のメッセージを分析し、意味のあるテーマに自動分類して、構造化されたMarkdownを生成してください。
-テーマの数に制限はありません。全ての情報を漏らさず整理してください。
-"""
-
-        return prompt
+..."""
 
     def _create_empty_document(self) -> str:
         """
@@ -156,47 +466,16 @@ class ContentOrganizer:
 本日は処理対象のメッセージがありませんでした。
 """
 
-    def _create_fallback_document(self, messages: List[Dict]) -> str:
+    def _create_fallback_document(self, messages: List[MessageRecord]) -> str:
         """
         Create a fallback document when Gemini API fails.
 
+        Messages are grouped into themes locally (see theme_clusterer).
+
         Args:
-            messages: List of message dictionaries
+            messages: List of message records
 
         Returns:
-            Simple Markdown document with all messages
+            Markdown document with all messages, organized by theme
         """
-        today = datetime.now().strftime("%Y年%m月%d日")
-
-        doc = f"""# {today} Telegramメッセージ整理
-
-## 📊 概要
-- 処理メッセージ数: {len(messages)}件
-- データソース: Telegram
-- 収集日時: {datetime.now().strftime("%Y-%m-%d %H:%M")}
-- 注意: AI整理に失敗したため、生データを記録しています
-
-## メッセージ一覧
-
-"""
-
-        for i, msg in enumerate(messages, 1):
-            chat_name = msg.get("chat_name", "Unknown")
-            sender = msg.get("sender", "Unknown")
-            date = msg.get("date", "")
-            text = msg.get("text", "")
-
-            try:
-                dt = datetime.fromisoformat(date.replace("Z", "+00:00"))
-                formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-            except:
-                formatted_date = date
-
-            doc += f"### メッセージ {i}\n\n"
-            doc += f"- **日時**: {formatted_date}\n"
-            doc += f"- **チャット**: {chat_name}\n"
-            doc += f"- **送信者**: {sender}\n\n"
-            doc += f"{text}\n\n"
-            doc += "---\n\n"
-
-        return doc
+        return build_theme_document(messages, note="AI整理に失敗したため、ローカルでテーマ分類しています")
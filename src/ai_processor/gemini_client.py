@@ -1,27 +1,135 @@
 """Gemini API client module for AI-powered content processing."""
 
-from typing import Optional
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import Callable, List, Optional, Tuple
 
 import google.generativeai as genai
 
+from src.ai_processor.message_selector import estimate_tokens
+from src.storage.state_manager import StateManager
+from src.utils.error_handler import GeminiAPIError, GeminiRateLimitError
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Retry backoff: the delay cap doubles per attempt from BACKOFF_BASE_SECONDS
+# up to BACKOFF_MAX_SECONDS, and the actual delay is drawn uniformly below it
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Per-day quota in a rate limit error (e.g. quota_id "GenerateRequestsPerDayPerProjectPerModel")
+_PER_DAY = re.compile(r"per ?day|daily", re.IGNORECASE)
+
+# Server-suggested wait in a rate limit error ("Please retry in 23.5s" or
+# "retry_delay { seconds: 23 }")
+_RETRY_AFTER = re.compile(r"retry in ([\d.]+)\s*s|retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+
+def cache_key(model_name: str, template_version: str, prompt: str) -> str:
+    """
+    Build the response cache key for a request.
+
+    Args:
+        model_name: Gemini model name
+        template_version: Version of the prompt template that built the prompt
+        prompt: Prompt text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (model_name, template_version, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Get the delay before retrying a failed attempt (exponential, full jitter).
+
+    Args:
+        attempt: Failed attempt number (0-based)
+
+    Returns:
+        Delay in seconds
+    """
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Get the wait suggested by the server in a rate limit error.
+
+    Args:
+        error: Exception raised by the API call
+
+    Returns:
+        Seconds to wait, or None if the error suggests none
+    """
+    match = _RETRY_AFTER.search(str(error))
+    if not match:
+        return None
+    return float(match.group(1) or match.group(2))
+
 
 class GeminiClient:
-    """Client for interacting with Google's Gemini API."""
+    """
+    Client for interacting with Google's Gemini API.
 
-    def __init__(self, api_key: str, model_name: str = "gemini-flash-latest"):
+    With a state manager, responses are cached in the state DB keyed by
+    model, prompt template version and prompt, so re-sending an identical
+    prompt (e.g. re-running after a failed upload) costs no API call.
+    generate_content_async() and generate_many() run calls concurrently
+    on the event loop, up to max_concurrency at a time.
+
+    Every API attempt is recorded in the state DB call ledger, and no more
+    than call_budget attempts are sent (see QuotaPlanner).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-flash-latest",
+        state_manager: Optional[StateManager] = None,
+        cache_max_age_hours: int = 72,
+        cache_max_mb: int = 50,
+        max_concurrency: int = 3,
+        timeout: float = 120.0
+    ):
         """
         Initialize Gemini API client.
 
         Args:
             api_key: Gemini API key
             model_name: Model to use (default: gemini-flash-latest)
+            state_manager: State manager holding the response cache and the
+                call ledger (None = no caching or recording)
+            cache_max_age_hours: Maximum age of a cached response in hours
+            cache_max_mb: Maximum total size of cached responses in MB
+                (0 = no caching)
+            max_concurrency: Maximum number of async calls in flight
+            timeout: Timeout per API call in seconds
         """
         self.api_key = api_key
         self.model_name = model_name
+        self.state_manager = state_manager
+        self.cache = state_manager if cache_max_mb > 0 else None
+        self.cache_max_age_hours = cache_max_age_hours
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.api_calls = 0
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Maximum API attempts this client may send (None = no limit)
+        self.call_budget: Optional[int] = None
 
         # Configure Gemini API
         genai.configure(api_key=api_key)
@@ -34,14 +142,17 @@ class GeminiClient:
     def generate_content(
         self,
         prompt: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        template_version: str = ""
     ) -> Optional[str]:
         """
-        Generate content using Gemini API.
+        Generate content using Gemini API (blocking).
 
         Args:
             prompt: Text prompt for generation
             max_retries: Maximum number of retry attempts (default: 3)
+            template_version: Version of the prompt template, part of the
+                cache key so that template changes invalidate old responses
 
         Returns:
             Generated text or None if failed
@@ -49,52 +160,397 @@ class GeminiClient:
         Raises:
             Exception: If API call fails after all retries
         """
+        key, cached = self._lookup_cache(prompt, template_version)
+        if cached is not None:
+            return cached
+
+        prompt_tokens = estimate_tokens(prompt)
+
         for attempt in range(max_retries):
+            server_delay = None
+            self._reserve_call()
+            logger.info(f"Calling Gemini API (attempt {attempt + 1}/{max_retries})")
+            started = time.monotonic()
+
             try:
-                logger.info(f"Calling Gemini API (attempt {attempt + 1}/{max_retries})")
+                response = self.model.generate_content(
+                    prompt,
+                    request_options={"timeout": self.timeout}
+                )
+                text = response.text if response else None
 
-                response = self.model.generate_content(prompt)
+            except Exception as e:
+                self._record_call(prompt_tokens, None, started, self._error_outcome(e))
+                server_delay = self._handle_error(e, attempt, max_retries)
 
-                if not response or not response.text:
-                    logger.warning("Gemini API returned empty response")
-                    continue
+            else:
+                self._record_call(prompt_tokens, text, started, "success" if text else "empty")
+                if text:
+                    return self._store_response(key, text)
 
-                logger.info(f"Gemini API call successful (response length: {len(response.text)} chars)")
-                return response.text
+                logger.warning("Gemini API returned empty response")
 
-            except Exception as e:
-                error_msg = str(e).lower()
-
-                # Check for rate limit errors
-                if "quota" in error_msg or "rate limit" in error_msg:
-                    logger.error(f"Gemini API rate limit exceeded: {e}")
-                    raise Exception(
-                        "Gemini API rate limit exceeded. "
-                        "Free tier allows 20 requests per day. "
-                        "Please try again tomorrow."
+            if attempt < max_retries - 1:
+                delay = max(backoff_delay(attempt), server_delay or 0)
+                logger.info(f"Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+        return None
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        template_version: str = ""
+    ) -> Optional[str]:
+        """
+        Generate content using Gemini API without blocking the event loop.
+
+        At most max_concurrency calls are in flight at once; each attempt
+        is cancelled after timeout seconds and retried after an
+        exponential backoff with jitter.
+
+        Args:
+            prompt: Text prompt for generation
+            max_retries: Maximum number of retry attempts (default: 3)
+            template_version: Version of the prompt template, part of the
+                cache key so that template changes invalidate old responses
+
+        Returns:
+            Generated text or None if failed
+
+        Raises:
+            Exception: If API call fails after all retries
+        """
+        key, cached = self._lookup_cache(prompt, template_version)
+        if cached is not None:
+            return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        prompt_tokens = estimate_tokens(prompt)
+
+        for attempt in range(max_retries):
+            server_delay = None
+            async with self._semaphore:
+                self._reserve_call()
+                logger.info(f"Calling Gemini API (attempt {attempt + 1}/{max_retries})")
+                started = time.monotonic()
+
+                try:
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt),
+                        timeout=self.timeout
                     )
+                    text = response.text if response else None
 
-                # Check for authentication errors
-                if "api key" in error_msg or "authentication" in error_msg:
-                    logger.error(f"Gemini API authentication failed: {e}")
-                    raise Exception(
-                        "Gemini API authentication failed. "
-                        "Please check your GEMINI_API_KEY in .env file."
+                except asyncio.TimeoutError:
+                    self._record_call(prompt_tokens, None, started, "timeout")
+                    logger.warning(
+                        f"Gemini API call timed out after {self.timeout:.0f}s "
+                        f"(attempt {attempt + 1}/{max_retries})"
                     )
+                    if attempt == max_retries - 1:
+                        raise
+                    text = None
 
-                # Log other errors
-                logger.warning(f"Gemini API error (attempt {attempt + 1}/{max_retries}): {e}")
+                except Exception as e:
+                    self._record_call(prompt_tokens, None, started, self._error_outcome(e))
+                    server_delay = self._handle_error(e, attempt, max_retries)
+                    text = None
 
-                # Retry on transient errors
-                if attempt < max_retries - 1:
-                    logger.info("Retrying...")
-                    continue
                 else:
-                    logger.error(f"Gemini API call failed after {max_retries} attempts")
-                    raise
+                    self._record_call(prompt_tokens, text, started, "success" if text else "empty")
+                    if not text:
+                        logger.warning("Gemini API returned empty response")
+
+            if text:
+                return self._store_response(key, text)
+
+            if attempt < max_retries - 1:
+                delay = max(backoff_delay(attempt), server_delay or 0)
+                logger.info(f"Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
 
         return None
 
+    async def generate_content_stream(
+        self,
+        prompt: str,
+        on_chunk: Callable[[str], None],
+        max_retries: int = 3,
+        template_version: str = ""
+    ) -> Optional[str]:
+        """
+        Generate content using Gemini API, passing text chunks on as they arrive.
+
+        The timeout applies to the wait for each chunk, so long generations
+        are not cut off while text keeps arriving. An attempt is retried
+        only if it failed before any text was passed on; after that the
+        error is raised and the receiver keeps the partial text. A cached
+        response is passed on as a single chunk.
+
+        Args:
+            prompt: Text prompt for generation
+            on_chunk: Called with each generated text chunk, in order
+            max_retries: Maximum number of retry attempts (default: 3)
+            template_version: Version of the prompt template, part of the
+                cache key so that template changes invalidate old responses
+
+        Returns:
+            Complete generated text or None if failed
+
+        Raises:
+            Exception: If API call fails after all retries or after text
+                was passed on
+        """
+        key, cached = self._lookup_cache(prompt, template_version)
+        if cached is not None:
+            on_chunk(cached)
+            return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        prompt_tokens = estimate_tokens(prompt)
+
+        for attempt in range(max_retries):
+            server_delay = None
+            parts: List[str] = []
+            async with self._semaphore:
+                self._reserve_call()
+                logger.info(f"Streaming from Gemini API (attempt {attempt + 1}/{max_retries})")
+                started = time.monotonic()
+                first_chunk_at = None
+
+                try:
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt, stream=True),
+                        timeout=self.timeout
+                    )
+                    chunks = response.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        if not chunk.text:
+                            continue
+                        if first_chunk_at is None:
+                            first_chunk_at = time.monotonic()
+                        parts.append(chunk.text)
+                        on_chunk(chunk.text)
+
+                except Exception as e:
+                    text = "".join(parts)
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._record_call(prompt_tokens, text, started, "timeout")
+                        logger.warning(
+                            f"Gemini API stream timed out after {self.timeout:.0f}s without data "
+                            f"(attempt {attempt + 1}/{max_retries}, {len(text)} chars received)"
+                        )
+                    else:
+                        self._record_call(prompt_tokens, text, started, self._error_outcome(e))
+
+                    if parts:
+                        logger.error(f"Gemini API stream failed after {len(text)} chars: {e}")
+                        raise
+                    if isinstance(e, asyncio.TimeoutError):
+                        if attempt == max_retries - 1:
+                            raise
+                    else:
+                        server_delay = self._handle_error(e, attempt, max_retries)
+
+                else:
+                    text = "".join(parts)
+                    self._record_call(prompt_tokens, text, started, "success" if text else "empty")
+
+                    if text:
+                        finished = time.monotonic()
+                        logger.info(
+                            f"Gemini API stream complete: first chunk after "
+                            f"{first_chunk_at - started:.2f}s, total {finished - started:.2f}s "
+                            f"({len(parts)} chunk(s), {len(text)} chars)"
+                        )
+                    else:
+                        logger.warning("Gemini API returned empty response")
+
+            if parts:
+                return self._store_response(key, text)
+
+            if attempt < max_retries - 1:
+                delay = max(backoff_delay(attempt), server_delay or 0)
+                logger.info(f"Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+        return None
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        template_version: str = "",
+        return_exceptions: bool = False
+    ) -> List:
+        """
+        Generate content for several prompts concurrently.
+
+        Args:
+            prompts: Text prompts
+            template_version: Version of the prompt template
+            return_exceptions: Return a failed call's exception in its place
+                instead of raising it
+
+        Returns:
+            Generated texts (or None/exceptions), in prompt order
+        """
+        return await asyncio.gather(
+            *(self.generate_content_async(prompt, template_version=template_version)
+              for prompt in prompts),
+            return_exceptions=return_exceptions
+        )
+
+    def _lookup_cache(self, prompt: str, template_version: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look up a prompt in the response cache.
+
+        Returns:
+            Tuple of (cache key or None if caching is disabled, cached response or None)
+        """
+        if not self.cache:
+            return None, None
+
+        key = cache_key(self.model_name, template_version, prompt)
+        cached = self.cache.get_cached_response(key)
+        if cached is None:
+            self.cache_misses += 1
+            return key, None
+
+        self.cache_hits += 1
+        logger.info(f"Gemini response served from cache (length: {len(cached)} chars)")
+        return key, cached
+
+    def _store_response(self, key: Optional[str], text: str) -> str:
+        """Log a successful response and store it in the cache."""
+        logger.info(f"Gemini API call successful (response length: {len(text)} chars)")
+        if key:
+            self.cache.save_cached_response(key, self.model_name, text)
+            self.cache.evict_cached_responses(self.cache_max_age_hours, self.cache_max_bytes)
+        return text
+
+    def _reserve_call(self) -> None:
+        """
+        Count one API attempt against the call budget.
+
+        Raises:
+            GeminiRateLimitError: If the call budget is used up
+        """
+        if self.call_budget is not None and self.api_calls >= self.call_budget:
+            logger.error(f"Gemini call budget for this run is used up ({self.call_budget} call(s))")
+            raise GeminiRateLimitError(
+                f"Gemini call budget for this run is used up ({self.call_budget} call(s))."
+            )
+        self.api_calls += 1
+
+    def _record_call(
+        self,
+        prompt_tokens: int,
+        response: Optional[str],
+        started: float,
+        outcome: str
+    ) -> None:
+        """Record one API attempt in the call ledger."""
+        if not self.state_manager:
+            return
+
+        self.state_manager.record_gemini_call(
+            model=self.model_name,
+            prompt_tokens=prompt_tokens,
+            response_tokens=estimate_tokens(response or ""),
+            latency_ms=int((time.monotonic() - started) * 1000),
+            outcome=outcome
+        )
+
+    @staticmethod
+    def _error_outcome(error: Exception) -> str:
+        """
+        Classify a failed API attempt for the call ledger.
+
+        Gemini reports per-minute and per-day limits with the same 429
+        text; only errors naming a per-day quota count as quota_exhausted,
+        all others as (transient) rate_limited.
+        """
+        error_msg = str(error).lower()
+        if "quota" in error_msg or "rate limit" in error_msg:
+            if _PER_DAY.search(error_msg):
+                return "quota_exhausted"
+            return "rate_limited"
+        if "api key" in error_msg or "authentication" in error_msg:
+            return "auth_error"
+        return "error"
+
+    @classmethod
+    def _handle_error(cls, error: Exception, attempt: int, max_retries: int) -> Optional[float]:
+        """
+        Raise for errors that retrying cannot fix, log the transient ones.
+
+        Rate limit errors are transient (per-minute limits): they are
+        retried with backoff like other errors, waiting at least as long as
+        the server suggests.
+
+        Returns:
+            Minimum wait before the next attempt in seconds, if the server
+            suggested one
+
+        Raises:
+            GeminiRateLimitError: On a rate limit error in the last attempt
+            GeminiAPIError: On authentication errors
+            Exception: When the last attempt failed
+        """
+        outcome = cls._error_outcome(error)
+
+        # Check for authentication errors
+        if outcome == "auth_error":
+            logger.error(f"Gemini API authentication failed: {error}")
+            raise GeminiAPIError(
+                "Gemini API authentication failed. "
+                "Please check your GEMINI_API_KEY in .env file."
+            )
+
+        # Check for the daily quota (retrying cannot help before the reset)
+        if outcome == "quota_exhausted":
+            logger.error(f"Gemini API daily quota exhausted: {error}")
+            raise GeminiRateLimitError(
+                "Gemini API daily quota exhausted. "
+                "Please try again after the daily quota resets."
+            )
+
+        # Check for rate limit errors
+        if outcome == "rate_limited":
+            if attempt == max_retries - 1:
+                logger.error(f"Gemini API rate limit exceeded after {max_retries} attempts: {error}")
+                raise GeminiRateLimitError(
+                    "Gemini API rate limit exceeded. "
+                    "Please try again later."
+                )
+            logger.warning(f"Gemini API rate limited (attempt {attempt + 1}/{max_retries}): {error}")
+            return retry_after(error)
+
+        # Log other errors
+        logger.warning(f"Gemini API error (attempt {attempt + 1}/{max_retries}): {error}")
+
+        if attempt == max_retries - 1:
+            logger.error(f"Gemini API call failed after {max_retries} attempts")
+            raise error
+
+        return None
+
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        """Fraction of cache lookups served from the cache (None if no lookups)."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
     def check_api_key(self) -> bool:
         """
         Verify that the API key is valid.
@@ -0,0 +1,200 @@
+"""Token-budget-aware message selection for the Gemini prompt."""
+
+import math
+import re
+from typing import Dict, List, Tuple
+
+from src.telegram_client.message_record import MessageRecord
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Share of the budget reserved for fair per-chat allocation (the rest is
+# filled by global score order)
+DEFAULT_FAIR_SHARE = 0.5
+
+# Tokens for the per-message prefix ("+H:MM alias: ", see prompt_encoder)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Omitted messages listed per chat in the appendix
+APPENDIX_EXAMPLES = 3
+
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uff00-\uffef]")
+_URL = re.compile(r"https?://|t\.me/", re.IGNORECASE)
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text.
+
+    CJK characters count as about one token each, other text as about one
+    token per four characters.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def message_tokens(message: MessageRecord) -> int:
+    """
+    Estimate the prompt tokens one message takes, including its header.
+
+    Args:
+        message: Message record
+
+    Returns:
+        Estimated token count
+    """
+    return estimate_tokens(message.text) + MESSAGE_OVERHEAD_TOKENS
+
+
+class MessageSelector:
+    """
+    Selects the most informative messages that fit a token budget.
+
+    Each message gets an information score from its length (log-scaled),
+    the rarity of its words within the run, links, reply count and the
+    number of other chats it was also posted in. A fair_share fraction of
+    the budget is split evenly across chats and filled with each chat's
+    best messages, so quiet chats are not crowded out; the rest of the
+    budget goes to the best remaining messages overall.
+    """
+
+    def __init__(self, token_budget: int, fair_share: float = DEFAULT_FAIR_SHARE):
+        """
+        Initialize MessageSelector.
+
+        Args:
+            token_budget: Maximum estimated tokens for the selected messages
+            fair_share: Fraction of the budget divided evenly across chats
+        """
+        self.token_budget = token_budget
+        self.fair_share = fair_share
+
+    def score_messages(self, messages: List[MessageRecord]) -> List[float]:
+        """
+        Compute the information score of every message.
+
+        Args:
+            messages: Message records
+
+        Returns:
+            Scores, in message order
+        """
+        words = [set(_WORD.findall(message.text.lower())) for message in messages]
+
+        document_frequency: Dict[str, int] = {}
+        for message_words in words:
+            for word in message_words:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+
+        total = len(messages)
+        scores = []
+        for message, message_words in zip(messages, words):
+            if message_words:
+                uniqueness = sum(
+                    math.log(total / document_frequency[word]) for word in message_words
+                ) / len(message_words)
+            else:
+                uniqueness = 0.0
+
+            scores.append(
+                math.log1p(len(message.text))
+                + uniqueness
+                + (1.0 if _URL.search(message.text) else 0.0)
+                + math.log1p(message.replies)
+                + 0.5 * len(message.also_in)
+            )
+        return scores
+
+    def select(
+        self,
+        messages: List[MessageRecord]
+    ) -> Tuple[List[MessageRecord], List[MessageRecord]]:
+        """
+        Split messages into the selected set and the omitted set.
+
+        Args:
+            messages: Message records
+
+        Returns:
+            Tuple of (selected, omitted) message lists, both in original order
+        """
+        tokens = [message_tokens(message) for message in messages]
+        if sum(tokens) <= self.token_budget:
+            return messages, []
+
+        scores = self.score_messages(messages)
+
+        by_chat: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            by_chat.setdefault(message.chat_name, []).append(i)
+        for indices in by_chat.values():
+            indices.sort(key=lambda i: -scores[i])
+
+        chosen = [False] * len(messages)
+        used = 0
+
+        # Pass 1: every chat gets an equal slice of the fair-share budget
+        chat_share = self.token_budget * self.fair_share / len(by_chat)
+        for indices in by_chat.values():
+            chat_used = 0
+            for i in indices:
+                if chat_used + tokens[i] > chat_share:
+                    continue
+                chosen[i] = True
+                chat_used += tokens[i]
+            used += chat_used
+
+        # Pass 2: best remaining messages overall fill the rest
+        for i in sorted(range(len(messages)), key=lambda i: -scores[i]):
+            if chosen[i] or used + tokens[i] > self.token_budget:
+                continue
+            chosen[i] = True
+            used += tokens[i]
+
+        selected = [message for i, message in enumerate(messages) if chosen[i]]
+        omitted = [message for i, message in enumerate(messages) if not chosen[i]]
+
+        logger.info(
+            f"Selected {len(selected)}/{len(messages)} messages "
+            f"(~{used} of {sum(tokens)} tokens, budget {self.token_budget})"
+        )
+        return selected, omitted
+
+
+def build_omitted_appendix(omitted: List[MessageRecord], limit: int = APPENDIX_EXAMPLES) -> str:
+    """
+    Build a compact Markdown appendix listing omitted messages per chat.
+
+    Args:
+        omitted: Messages left out of the prompt
+        limit: Example snippets shown per chat
+
+    Returns:
+        Markdown string (empty if nothing was omitted)
+    """
+    if not omitted:
+        return ""
+
+    by_chat: Dict[str, List[MessageRecord]] = {}
+    for message in omitted:
+        by_chat.setdefault(message.chat_name, []).append(message)
+
+    parts = [f"\n\n## 📎 省略されたメッセージ\n\n"
+             f"トークン上限のため、以下の {len(omitted)}件はAI整理の対象外となりました。\n\n"]
+    for chat_name, messages in by_chat.items():
+        examples = " / ".join(
+            message.text.strip().replace("\n", " ")[:60] for message in messages[:limit]
+        )
+        parts.append(f"- **{chat_name}**: {len(messages)}件（例: {examples}）\n")
+
+    return "".join(parts)
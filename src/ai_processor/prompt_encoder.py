@@ -0,0 +1,129 @@
+"""Compact message encoding for Gemini prompts."""
+
+from itertools import product
+from string import ascii_uppercase
+from typing import Dict, Iterator, List
+
+from src.ai_processor.message_selector import estimate_tokens
+from src.telegram_client.message_record import MessageRecord, format_timestamp
+
+
+def _aliases() -> Iterator[str]:
+    """Yield short sender aliases: A..Z, then AA..ZZ, AAA.. and so on."""
+    length = 1
+    while True:
+        for letters in product(ascii_uppercase, repeat=length):
+            yield "".join(letters)
+        length += 1
+
+
+def sender_aliases(messages: List[MessageRecord]) -> Dict[str, str]:
+    """
+    Assign short aliases to senders, shortest to the most active.
+
+    Args:
+        messages: Message records
+
+    Returns:
+        Dictionary mapping sender name to alias, most active sender first
+    """
+    counts: Dict[str, int] = {}
+    for message in messages:
+        counts[message.sender] = counts.get(message.sender, 0) + 1
+
+    ranked = sorted(counts, key=lambda sender: -counts[sender])
+    return dict(zip(ranked, _aliases()))
+
+
+def _offset(seconds: int) -> str:
+    """Format an offset from the chat's start time as '+H:MM'."""
+    minutes = seconds // 60
+    return f"+{minutes // 60}:{minutes % 60:02d}"
+
+
+def encode_messages(messages: List[MessageRecord]) -> str:
+    """
+    Encode messages compactly for a prompt.
+
+    A legend maps short aliases to sender names. Messages are grouped
+    under one header per chat, giving the time of the chat's first
+    message, and each message line carries only its offset from that time
+    and the sender alias.
+
+    Args:
+        messages: Message records
+
+    Returns:
+        Encoded message text
+    """
+    aliases = sender_aliases(messages)
+
+    by_chat: Dict[str, List[MessageRecord]] = {}
+    for message in messages:
+        by_chat.setdefault(message.chat_name, []).append(message)
+
+    legend = ", ".join(f"{alias}={sender}" for sender, alias in aliases.items())
+    parts = [f"送信者: {legend}\n"]
+
+    for chat_name, chat_messages in by_chat.items():
+        chat_messages.sort(key=lambda m: m.timestamp)
+        start = chat_messages[0].timestamp
+        parts.append(f"\n### {chat_name}（{format_timestamp(start)} UTC〜）\n")
+
+        for message in chat_messages:
+            also_in = f" (+ {', '.join(message.also_in)})" if message.also_in else ""
+            parts.append(
+                f"{_offset(message.timestamp - start)} {aliases[message.sender]}{also_in}: "
+                f"{message.text}\n"
+            )
+
+    return "".join(parts)
+
+
+def encode_messages_verbose(messages: List[MessageRecord]) -> str:
+    """
+    Encode messages with full metadata on every line (the original format).
+
+    Args:
+        messages: Message records
+
+    Returns:
+        Encoded message text
+    """
+    return "\n".join(
+        f"[{i}] {msg.formatted_date} | {msg.source_chats} | {msg.sender}:\n{msg.text}\n"
+        for i, msg in enumerate(messages, 1)
+    )
+
+
+class EncodingReport:
+    """Estimated prompt tokens of the compact encoding versus the verbose one."""
+
+    def __init__(self):
+        self.verbose_tokens = 0
+        self.compact_tokens = 0
+
+    def add(self, messages: List[MessageRecord], encoded: str) -> None:
+        """
+        Count one encoded message block.
+
+        Args:
+            messages: Message records that were encoded
+            encoded: Compact encoding of the messages
+        """
+        self.verbose_tokens += estimate_tokens(encode_messages_verbose(messages))
+        self.compact_tokens += estimate_tokens(encoded)
+
+    @property
+    def saved_ratio(self) -> float:
+        """Fraction of tokens saved by the compact encoding."""
+        if not self.verbose_tokens:
+            return 0.0
+        return 1 - self.compact_tokens / self.verbose_tokens
+
+    def summary(self) -> str:
+        """One-line before/after report."""
+        return (
+            f"~{self.verbose_tokens} -> ~{self.compact_tokens} tokens "
+            f"({self.saved_ratio:.0%} saved)"
+        )
@@ -0,0 +1,88 @@
+"""Gemini quota planning from the per-call ledger."""
+
+from datetime import datetime, time
+from typing import Dict
+
+import pytz
+
+from src.storage.state_manager import StateManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Gemini free tier: requests per day
+DEFAULT_DAILY_LIMIT = 20
+
+# Gemini daily quotas reset at midnight Pacific time
+DEFAULT_QUOTA_TIMEZONE = "America/Los_Angeles"
+
+
+class QuotaPlanner:
+    """
+    Decides how many Gemini calls a run may spend.
+
+    Every API attempt recorded in the call ledger since the last quota reset
+    counts against the daily limit, including retries, timeouts and failed
+    runs. Once the API has reported the per-day quota as exhausted in the
+    current quota day, no further calls are planned until the next reset;
+    per-minute rate limits (outcome rate_limited) are transient and only
+    count as attempts.
+    """
+
+    def __init__(
+        self,
+        state_manager: StateManager,
+        daily_limit: int = DEFAULT_DAILY_LIMIT,
+        quota_timezone: str = DEFAULT_QUOTA_TIMEZONE
+    ):
+        """
+        Initialize QuotaPlanner.
+
+        Args:
+            state_manager: State manager holding the call ledger
+            daily_limit: Gemini API requests allowed per quota day
+            quota_timezone: Time zone whose midnight resets the quota
+        """
+        self.state_manager = state_manager
+        self.daily_limit = daily_limit
+        self.timezone = pytz.timezone(quota_timezone)
+
+    def quota_day_start(self) -> datetime:
+        """
+        Get the start of the current quota day.
+
+        Returns:
+            Timezone-aware datetime of the last quota reset
+        """
+        today = datetime.now(self.timezone).date()
+        return self.timezone.localize(datetime.combine(today, time.min))
+
+    def usage(self) -> Dict[str, int]:
+        """
+        Get the API attempts of the current quota day per outcome.
+
+        Returns:
+            Dictionary mapping outcome to number of attempts
+        """
+        return self.state_manager.get_gemini_call_counts(self.quota_day_start())
+
+    def remaining(self) -> int:
+        """
+        Get the number of calls still available in the current quota day.
+
+        Returns:
+            Calls this run may spend (0 if the quota is used up)
+        """
+        usage = self.usage()
+        used = sum(usage.values())
+
+        if usage.get("quota_exhausted"):
+            logger.warning(
+                f"Gemini API reported the daily quota as exhausted "
+                f"({used} attempt(s) recorded) - no calls planned until the reset"
+            )
+            return 0
+
+        remaining = max(0, self.daily_limit - used)
+        logger.info(f"Gemini API calls today: {used}/{self.daily_limit} ({remaining} remaining)")
+        return remaining
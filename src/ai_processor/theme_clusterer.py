@@ -0,0 +1,330 @@
+"""Offline theme clustering (TF-IDF + spherical k-means) for when Gemini is unavailable."""
+
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.telegram_client.message_record import MessageRecord
+from src.utils.logger import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is needed only for clustering
+    np = None
+
+logger = get_logger(__name__)
+
+# Upper bound on the number of themes in the document
+DEFAULT_MAX_THEMES = 12
+
+# Vocabulary size (most frequent terms kept)
+MAX_FEATURES = 5000
+
+# Terms in more than this share of the messages carry no theme information
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+# Below this many messages, terms in a single message are kept and only
+# terms in every message are dropped (the bounds above would leave no terms)
+SMALL_INPUT_MESSAGES = 50
+
+# k-means iterations (stops earlier when assignments no longer change)
+MAX_ITERATIONS = 15
+
+# Top terms used as a theme label
+LABEL_TERMS = 3
+
+# Top terms considered for a label (CJK bigrams often collapse into one word)
+LABEL_CANDIDATES = 12
+
+_URL = re.compile(r"https?://\S+|t\.me/\S+", re.IGNORECASE)
+_LATIN = re.compile(r"[a-z][a-z0-9_$]{1,}")
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]{2,}")
+
+# Label words are runs of one script; hiragana is left out (mostly particles and inflections)
+_LABEL_CJK = re.compile(r"[\u30a0-\u30ff]{2,}|[\u3400-\u9fff]{2,}|[\uac00-\ud7af]{2,}")
+
+_STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have he her his how i if in
+is it its just me my no not of on or our so than that the their them then
+there they this to up was we what when which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split message text into terms.
+
+    Latin words are lower-cased and stop words removed; runs of CJK
+    characters, which have no word boundaries, are split into character
+    bigrams. URLs are ignored.
+
+    Args:
+        text: Message text
+
+    Returns:
+        List of terms
+    """
+    text = _URL.sub(" ", text.lower())
+    terms = [word for word in _LATIN.findall(text) if word not in _STOPWORDS]
+    for run in _CJK.findall(text):
+        terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def label_terms(terms: List[str], messages: List[MessageRecord]) -> List[str]:
+    """
+    Turn a theme's top terms into readable label words.
+
+    CJK terms are character bigrams (e.g. "ポイ", "イン"); each is replaced
+    by the most frequent run of the same script in the theme's messages
+    that contains it ("ポイント"). Runs are katakana, kanji or hangul only,
+    so words do not run into particles. Duplicates and words contained in
+    another label word are dropped.
+
+    Args:
+        terms: Top terms of the theme, most distinctive first
+        messages: Messages of the theme
+
+    Returns:
+        Up to LABEL_TERMS label words
+    """
+    runs = Counter(
+        run for message in messages for run in _LABEL_CJK.findall(message.text.lower())
+    )
+
+    words: List[str] = []
+    for term in terms:
+        if _CJK.fullmatch(term):
+            containing = [run for run in runs if term in run]
+            if not containing:
+                continue
+            term = max(containing, key=lambda run: (runs[run], len(run)))
+        if term not in words:
+            words.append(term)
+
+    label = [word for word in words if not any(word != other and word in other for other in words)]
+    return label[:LABEL_TERMS]
+
+
+class ThemeClusterer:
+    """
+    Groups messages into themes without an API.
+
+    Messages become L2-normalized TF-IDF vectors, stored sparsely (CSR
+    arrays), and are clustered with spherical k-means, i.e. by cosine
+    similarity to unit-length centroids. Similarities and centroid updates
+    are computed with vectorized NumPy operations over the non-zero
+    entries, so the cost grows linearly with the number of messages.
+    """
+
+    def __init__(self, max_themes: int = DEFAULT_MAX_THEMES, seed: int = 0):
+        """
+        Initialize ThemeClusterer.
+
+        Args:
+            max_themes: Maximum number of themes
+            seed: Random seed for the initial centroids
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("NumPy is required for theme clustering (pip install numpy)")
+
+        self.max_themes = max_themes
+        self.seed = seed
+
+    def cluster(self, messages: List[MessageRecord]) -> List[Tuple[str, List[MessageRecord]]]:
+        """
+        Group messages into labelled themes.
+
+        Args:
+            messages: Message records
+
+        Returns:
+            List of (label, messages) tuples, largest theme first; messages
+            without any informative term form a final "その他" theme
+        """
+        vocabulary, doc, term, data = self._tfidf(messages)
+
+        documents = np.unique(doc)
+        rest = np.setdiff1d(np.arange(len(messages)), documents)
+        themes: List[Tuple[str, List[MessageRecord]]] = []
+
+        if len(documents):
+            # Re-index documents with at least one term to 0..n-1
+            row = np.searchsorted(documents, doc)
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(row, minlength=len(documents)))))
+            theme_count = min(self.max_themes, max(1, round(math.sqrt(len(documents)) / 4)))
+
+            labels, centroids = self._kmeans(row, term, data, indptr, len(vocabulary), theme_count)
+
+            # Label terms: highest centroid weight relative to the average message
+            average = np.bincount(term, weights=data, minlength=len(vocabulary)) / len(documents)
+            distinctive = centroids - average
+
+            for cluster in np.argsort(-np.bincount(labels, minlength=theme_count)):
+                members = documents[labels == cluster]
+                if not len(members):
+                    continue
+                top = np.argsort(-distinctive[cluster])[:LABEL_CANDIDATES]
+                terms = [vocabulary[i] for i in top if distinctive[cluster, i] > 0]
+                member_messages = [messages[i] for i in members]
+                label = " / ".join(label_terms(terms, member_messages)) or "全般"
+                themes.append((label, member_messages))
+
+        if len(rest):
+            themes.append(("その他", [messages[i] for i in rest]))
+
+        logger.info(f"Clustered {len(messages)} messages into {len(themes)} theme(s)")
+        return themes
+
+    def _tfidf(self, messages: List[MessageRecord]):
+        """
+        Build sparse TF-IDF vectors.
+
+        Returns:
+            Tuple of (vocabulary list, document index, term index, weight)
+            arrays of the non-zero entries, sorted by document then term
+        """
+        term_ids: Dict[str, int] = {}
+        flat: List[int] = []
+        lengths: List[int] = []
+        for message in messages:
+            terms = tokenize(message.text)
+            lengths.append(len(terms))
+            flat.extend(term_ids.setdefault(t, len(term_ids)) for t in terms)
+
+        if not flat:
+            empty = np.zeros(0, dtype=np.int64)
+            return [], empty, empty, np.zeros(0)
+
+        # Term counts per (document, term) pair
+        terms_all = len(term_ids)
+        keys = np.repeat(np.arange(len(messages), dtype=np.int64), lengths) * terms_all
+        keys += np.asarray(flat, dtype=np.int64)
+        pairs, counts = np.unique(keys, return_counts=True)
+        doc, term = np.divmod(pairs, terms_all)
+
+        # Keep terms in min_df..max_df of the messages, most frequent first
+        df = np.bincount(term, minlength=terms_all)
+        if len(messages) < SMALL_INPUT_MESSAGES:
+            min_df, max_df = 1, len(messages) - 1
+        else:
+            min_df, max_df = 2, MAX_DOCUMENT_FREQUENCY * len(messages)
+        candidates = np.flatnonzero((df >= min_df) & (df <= max_df))
+        kept = candidates[np.argsort(-df[candidates], kind="stable")[:MAX_FEATURES]]
+
+        if not len(kept):
+            logger.warning(
+                f"No informative terms in {len(messages)} messages "
+                f"(document frequency {min_df}..{max_df:g}) - themes cannot be separated"
+            )
+
+        remap = np.full(terms_all, -1, dtype=np.int64)
+        remap[kept] = np.arange(len(kept))
+        names = list(term_ids)
+        vocabulary = [names[i] for i in kept]
+
+        mask = remap[term] >= 0
+        doc, term, counts = doc[mask], remap[term[mask]], counts[mask]
+
+        idf = np.log(len(messages) / df[kept]) + 1.0
+        data = (1.0 + np.log(counts)) * idf[term]
+
+        norms = np.sqrt(np.bincount(doc, weights=data * data, minlength=len(messages)))
+        data /= norms[doc]
+        return vocabulary, doc, term, data
+
+    def _kmeans(self, row, term, data, indptr, features: int, k: int):
+        """
+        Spherical k-means over CSR rows.
+
+        Returns:
+            Tuple of (cluster label per row, k x features centroid matrix)
+        """
+        n = len(indptr) - 1
+        rng = np.random.default_rng(self.seed)
+        seeds = rng.choice(n, size=k, replace=False)
+
+        centroids = np.zeros((k, features))
+        for cluster, i in enumerate(seeds):
+            start, end = indptr[i], indptr[i + 1]
+            centroids[cluster, term[start:end]] = data[start:end]
+
+        labels = np.full(n, -1)
+        for iteration in range(MAX_ITERATIONS):
+            # Cosine similarity of every row to every centroid
+            similarities = np.empty((k, n))
+            for cluster in range(k):
+                similarities[cluster] = np.add.reduceat(centroids[cluster, term] * data, indptr[:-1])
+
+            new_labels = similarities.argmax(axis=0)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+
+            sums = np.bincount(labels[row] * features + term, weights=data, minlength=k * features)
+            centroids = sums.reshape(k, features)
+
+            # Re-seed empty clusters with the rows fitting their centroid worst
+            empty = np.flatnonzero(np.bincount(labels, minlength=k) == 0)
+            if len(empty):
+                worst = np.argsort(similarities.max(axis=0))[:len(empty)]
+                for cluster, i in zip(empty, worst):
+                    start, end = indptr[i], indptr[i + 1]
+                    centroids[cluster, term[start:end]] = data[start:end]
+                    labels[i] = cluster
+
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms > 0, norms, 1.0)
+
+        logger.debug(f"k-means: {k} cluster(s), {iteration + 1} iteration(s)")
+        return labels, centroids
+
+
+def build_theme_document(messages: List[MessageRecord], note: Optional[str] = None) -> str:
+    """
+    Build the themed Markdown document without Gemini.
+
+    Uses the same structure as the Gemini output (overview, then one
+    section per theme). Without NumPy, all messages go into one section.
+
+    Args:
+        messages: List of message records
+        note: Reason shown in the overview (e.g. why Gemini was not used)
+
+    Returns:
+        Markdown document
+    """
+    if np is not None:
+        themes = ThemeClusterer().cluster(messages)
+        method = "TF-IDF + k-means によるローカルのテーマ分類"
+    else:
+        logger.warning("NumPy is not installed - writing messages without theme clustering")
+        themes = [("全メッセージ", messages)]
+        method = "テーマ分類なし（NumPy未インストール）"
+
+    today = datetime.now().strftime("%Y年%m月%d日")
+    parts = [f"""# {today} Telegramメッセージ整理
+
+## 📊 概要
+- 処理メッセージ数: {len(messages)}件
+- データソース: Telegram
+- 収集日時: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+- 整理方法: {method}
+"""]
+    if note:
+        parts.append(f"- 注意: {note}\n")
+    parts.append("\n## テーマ別整理\n\n")
+
+    for index, (label, theme_messages) in enumerate(themes, 1):
+        parts.append(f"### テーマ{index}: {label}（{len(theme_messages)}件）\n\n")
+        for msg in sorted(theme_messages, key=lambda m: m.timestamp):
+            text = msg.text.strip().replace("\n", "\n  ")
+            parts.append(f"- **{msg.formatted_date} | {msg.source_chats} | {msg.sender}**: {text}\n")
+        parts.append("\n")
+
+    return "".join(parts)
@@ -1,5 +1,6 @@
 """Markdown builder module for creating and saving Markdown documents."""
 
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -8,6 +9,69 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Suffix of a backup file that is still being written
+PARTIAL_SUFFIX = ".part"
+
+
+class MarkdownStream:
+    """
+    Markdown backup file written incrementally.
+
+    Text goes to "<name>.md.part" as it arrives and is flushed right away,
+    so an interrupted run leaves the partial text on disk. commit() renames
+    the file to its final name atomically.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize MarkdownStream.
+
+        Args:
+            path: Final path of the Markdown file
+        """
+        self.path = path
+        self.partial_path = path.with_name(path.name + PARTIAL_SUFFIX)
+        self.chars_written = 0
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+
+    def write(self, text: str) -> None:
+        """
+        Append text to the file.
+
+        Args:
+            text: Markdown text
+        """
+        self._file.write(text)
+        self._file.flush()
+        self.chars_written += len(text)
+
+    def commit(self) -> str:
+        """
+        Finish the file and move it to its final name.
+
+        Returns:
+            Path to saved file
+        """
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+        logger.info(f"Markdown saved to: {self.path}")
+        return str(self.path)
+
+    def abort(self) -> str:
+        """
+        Close the file, keeping the partial text under its partial name.
+
+        Returns:
+            Path to the partial file
+        """
+        self._file.close()
+        logger.warning(
+            f"Markdown backup incomplete - partial text ({self.chars_written} chars) "
+            f"kept in: {self.partial_path}"
+        )
+        return str(self.partial_path)
+
 
 class MarkdownBuilder:
     """Builds and saves Markdown documents."""
@@ -57,26 +121,33 @@ class MarkdownBuilder:
         Returns:
             Path to saved file
         """
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"telegram_messages_{timestamp}.md"
+        try:
+            stream = self.open_stream(filename)
+            stream.write(content)
+            return stream.commit()
 
-        file_path = self.backup_dir / filename
+        except Exception as e:
+            logger.error(f"Failed to save Markdown: {e}")
+            raise
 
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+    def open_stream(self, filename: Optional[str] = None) -> MarkdownStream:
+        """
+        Open a Markdown backup file for incremental writing.
 
-            logger.info(f"Markdown saved to: {file_path}")
+        Args:
+            filename: Custom filename (default: auto-generated with timestamp)
 
-            # Clean up old backup files
-            self._cleanup_old_backups()
+        Returns:
+            MarkdownStream writing to the backup directory
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"telegram_messages_{timestamp}.md"
 
-            return str(file_path)
+        # Clean up old backup files
+        self._cleanup_old_backups()
 
-        except Exception as e:
-            logger.error(f"Failed to save Markdown: {e}")
-            raise
+        return MarkdownStream(self.backup_dir / filename)
 
     def _cleanup_old_backups(self) -> None:
         """
@@ -86,7 +157,8 @@ class MarkdownBuilder:
             cutoff_time = datetime.now() - timedelta(days=self.retention_days)
             deleted_count = 0
 
-            for file_path in self.backup_dir.glob("*.md"):
+            old_files = [*self.backup_dir.glob("*.md"), *self.backup_dir.glob(f"*.md{PARTIAL_SUFFIX}")]
+            for file_path in old_files:
                 # Get file modification time
                 file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
 
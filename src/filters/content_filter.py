@@ -1,90 +1,204 @@
 """Content filtering module for removing noise from Telegram messages."""
 
 import re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
+from src.telegram_client.message_record import MessageRecord
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Patterns that can't be embedded in a combined alternation as-is:
+# back-references (group numbers shift) and named groups (names may clash)
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]")
 
-def filter_messages(messages: List[Dict], config: Dict) -> List[Dict]:
+# Leading global inline flags, e.g. "(?i)", rewritten as a scoped group
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+class ExcludeMatcher:
+    """
+    All exclude_patterns compiled into one alternation.
+
+    Each pattern becomes a named group "r<index>", so a single match() call
+    tests every pattern and match.lastgroup tells which rule fired. Because
+    all alternatives are anchored at the start of the text, the first
+    pattern in list order that matches wins, as with one-by-one matching.
+    Patterns that can't be combined safely are tried individually afterwards.
     """
-    Filter messages based on configuration rules.
 
-    Filtering rules:
-    1. Remove messages shorter than min_message_length
-    2. Remove messages matching exclude_patterns (regex)
-    3. Remove system messages (no text content)
+    def __init__(self, patterns: Tuple[str, ...]):
+        """
+        Initialize ExcludeMatcher.
+
+        Args:
+            patterns: Regex patterns (invalid ones are logged and skipped)
+        """
+        self.rules: List[str] = []
+        self.fallback: List[re.Pattern] = []
+        alternatives = []
+
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                logger.warning(f"Invalid regex pattern '{pattern}': {e}")
+                continue
+
+            if _UNCOMBINABLE.search(pattern):
+                self.fallback.append(re.compile(pattern))
+                continue
+
+            flags = _GLOBAL_FLAGS.match(pattern)
+            body = f"(?{flags.group(1)}:{pattern[flags.end():]})" if flags else pattern
+            alternatives.append(f"(?P<r{len(self.rules)}>{body})")
+            self.rules.append(pattern)
+
+        self.combined = re.compile("|".join(alternatives)) if alternatives else None
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Find the rule matching the start of the text.
+
+        Args:
+            text: Message text
+
+        Returns:
+            The pattern that matched, or None
+        """
+        if self.combined is not None:
+            match = self.combined.match(text)
+            if match:
+                return self.rules[int(match.lastgroup[1:])]
+
+        for pattern in self.fallback:
+            if pattern.match(text):
+                return pattern.pattern
+
+        return None
+
+
+@lru_cache(maxsize=16)
+def compile_exclude_patterns(patterns: Tuple[str, ...]) -> ExcludeMatcher:
+    """
+    Get the matcher for a set of exclude patterns, compiled once per set.
 
     Args:
-        messages: List of message dictionaries
-        config: Configuration dictionary with filters settings
-            - min_message_length: Minimum message length (default: 10)
-            - exclude_patterns: List of regex patterns to exclude
+        patterns: Regex patterns from the filters configuration
 
     Returns:
-        List of filtered message dictionaries
+        ExcludeMatcher instance
+    """
+    return ExcludeMatcher(patterns)
+
+
+class FilterStage:
+    """
+    Base class for one step of the filter pipeline.
+
+    A stage receives a list of message records and returns the ones it
+    keeps. Stages with scope "batch" run on every fetched batch as it
+    streams in; stages with scope "run" need all messages at once and run
+    after every chat has been collected (see FilterPipeline).
+    """
+
+    name = ""
+    scope = "batch"
+
+    def __init__(self, config: Dict):
+        """
+        Initialize the stage.
+
+        Args:
+            config: The "filters" section of target_chats.yaml
+        """
+        self.config = config
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        """
+        Filter a list of messages.
+
+        Args:
+            messages: Message records
+
+        Returns:
+            Message records that pass this stage
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        """
+        Get stage-specific statistics to merge into the run's filter stats.
+
+        Returns:
+            Statistics dictionary (empty by default)
+        """
+        return {}
+
+
+class NoTextFilter(FilterStage):
+    """Removes messages with no text content (system messages, media only)."""
+
+    name = "no_text"
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        return [message for message in messages if message.text and not message.text.isspace()]
+
+
+class MinLengthFilter(FilterStage):
+    """Removes messages shorter than min_message_length."""
+
+    name = "min_length"
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self.min_length = config.get("min_message_length", 10)
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        kept = []
+        for message in messages:
+            text = message.text.strip() if message.text else ""
+            if len(text) < self.min_length:
+                logger.debug(f"Filtered (too short): '{text[:30]}...'")
+                continue
+            kept.append(message)
+        return kept
+
+
+class ExcludePatternFilter(FilterStage):
+    """Removes messages matching exclude_patterns, counting hits per pattern."""
+
+    name = "exclude_patterns"
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self.matcher = compile_exclude_patterns(tuple(config.get("exclude_patterns", [])))
+        self.rule_hits: Dict[str, int] = {}
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        kept = []
+        for message in messages:
+            text = message.text.strip() if message.text else ""
+            rule = self.matcher.match(text)
+            if rule is not None:
+                self.rule_hits[rule] = self.rule_hits.get(rule, 0) + 1
+                logger.debug(f"Filtered (pattern match): '{text[:30]}...' matched '{rule}'")
+                continue
+            kept.append(message)
+        return kept
+
+    def stats(self) -> Dict:
+        return {"pattern_rules": dict(self.rule_hits)}
+
+
+def merge_rule_hits(target: Dict[str, int], hits: Dict[str, int]) -> None:
+    """
+    Add per-pattern match counts into a running total.
+
+    Args:
+        target: Counter dictionary updated in place
+        hits: Match counts keyed by pattern
     """
-    if not messages:
-        logger.info("No messages to filter")
-        return []
-
-    min_length = config.get("min_message_length", 10)
-    exclude_patterns = config.get("exclude_patterns", [])
-
-    # Compile regex patterns
-    compiled_patterns = []
-    for pattern in exclude_patterns:
-        try:
-            compiled_patterns.append(re.compile(pattern))
-        except re.error as e:
-            logger.warning(f"Invalid regex pattern '{pattern}': {e}")
-
-    filtered_messages = []
-    stats = {
-        "total": len(messages),
-        "too_short": 0,
-        "pattern_match": 0,
-        "no_text": 0,
-    }
-
-    for message in messages:
-        text = message.get("text", "")
-
-        # Filter 1: Remove messages with no text (system messages)
-        if not text or not text.strip():
-            stats["no_text"] += 1
-            continue
-
-        # Filter 2: Remove messages shorter than minimum length
-        if len(text.strip()) < min_length:
-            stats["too_short"] += 1
-            logger.debug(f"Filtered (too short): '{text[:30]}...'")
-            continue
-
-        # Filter 3: Remove messages matching exclude patterns
-        matched = False
-        for pattern in compiled_patterns:
-            if pattern.match(text.strip()):
-                stats["pattern_match"] += 1
-                logger.debug(f"Filtered (pattern match): '{text[:30]}...' matched '{pattern.pattern}'")
-                matched = True
-                break
-
-        if matched:
-            continue
-
-        # Message passed all filters
-        filtered_messages.append(message)
-
-    # Log filtering statistics
-    filtered_count = stats["total"] - len(filtered_messages)
-    logger.info(
-        f"Filtered {filtered_count}/{stats['total']} messages "
-        f"(too short: {stats['too_short']}, "
-        f"pattern match: {stats['pattern_match']}, "
-        f"no text: {stats['no_text']})"
-    )
-
-    return filtered_messages
+    for rule, count in hits.items():
+        target[rule] = target.get(rule, 0) + count
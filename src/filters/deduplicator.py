@@ -0,0 +1,246 @@
+"""Cross-chat near-duplicate detection with MinHash signatures and LSH."""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.filters.content_filter import FilterStage
+from src.telegram_client.message_record import MessageRecord
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Characters per shingle (character shingles also work for text without spaces)
+SHINGLE_SIZE = 5
+
+# MinHash signature length = LSH bands x rows per band
+DEFAULT_BANDS = 16
+DEFAULT_ROWS = 4
+
+# Minimum (estimated) Jaccard similarity for two messages to be merged
+DEFAULT_THRESHOLD = 0.8
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# Marker for an empty MinHash bin (larger than any 48-bit hash)
+_EMPTY = 1 << 62
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize message text for duplicate detection.
+
+    Applies NFKC (full-width/half-width forms), lower-cases and removes
+    whitespace, punctuation and emoji, so copies that differ only in
+    formatting normalize to the same string.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Normalized text
+    """
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+@lru_cache(maxsize=None)
+def _shingle_pattern(size: int) -> re.Pattern:
+    """Regex whose findall() returns all overlapping shingles of the given size."""
+    return re.compile(f"(?=(.{{{size}}}))", re.DOTALL)
+
+
+def shingles(normalized: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """
+    Get the overlapping character shingles of normalized text.
+
+    Args:
+        normalized: Text from normalize_text()
+        size: Characters per shingle
+
+    Returns:
+        List of shingles (the whole text if it is shorter than a shingle)
+    """
+    if len(normalized) <= size:
+        return [normalized]
+    return _shingle_pattern(size).findall(normalized)
+
+
+def minhash_signature(shingle_list: List[str], length: int) -> Tuple[int, ...]:
+    """
+    Compute a one-permutation MinHash signature.
+
+    Each shingle is hashed once and assigned to one of `length` bins, and
+    each bin keeps its minimum, so the cost is one pass over the shingles
+    regardless of the signature length. Empty bins take the value of the
+    next non-empty bin (rotation densification) so that signatures of short
+    texts stay comparable.
+
+    Python's string hash is salted per process, which is fine here because
+    signatures are only compared within one run.
+
+    Args:
+        shingle_list: Shingles from shingles()
+        length: Signature length
+
+    Returns:
+        Signature tuple
+    """
+    bins = [_EMPTY] * length
+    for h in map(hash, shingle_list):
+        h &= 0xFFFFFFFFFFFF
+        index = h % length
+        if h < bins[index]:
+            bins[index] = h
+
+    if _EMPTY in bins:
+        filled = [i for i, value in enumerate(bins) if value != _EMPTY]
+        for i in range(length):
+            if bins[i] == _EMPTY:
+                donor = next((j for j in filled if j > i), filled[0])
+                bins[i] = bins[donor] + ((donor - i) % length << 48)
+    return tuple(bins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures of cluster representatives.
+
+    A message is compared only with representatives sharing at least one
+    band of its signature, and merged when the similarity estimated from
+    the signatures reaches the threshold. Only signatures are kept, and
+    work per message is constant on average, so indexing n messages is O(n).
+
+    Texts whose normalized form is shorter than a shingle (e.g. emoji,
+    symbols or a single word) carry too little content to tell copies from
+    coincidences and are never merged.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        bands: int = DEFAULT_BANDS,
+        rows: int = DEFAULT_ROWS
+    ):
+        """
+        Initialize NearDuplicateIndex.
+
+        Args:
+            threshold: Minimum Jaccard similarity for a duplicate
+            bands: Number of LSH bands
+            rows: Signature values per band
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[Tuple, List[int]] = {}
+        self._exact: Dict[str, int] = {}
+        self._signatures: List[Optional[Tuple[int, ...]]] = []
+
+    def add(self, text: str) -> Tuple[int, bool]:
+        """
+        Add a text, merging it with an existing cluster if it is a duplicate.
+
+        Args:
+            text: Message text
+
+        Returns:
+            Tuple of (cluster index, whether the text joined an existing cluster)
+        """
+        normalized = normalize_text(text)
+
+        if len(normalized) < SHINGLE_SIZE:
+            # Own cluster, not indexed
+            self._signatures.append(None)
+            return len(self._signatures) - 1, False
+
+        cluster = self._exact.get(normalized)
+        if cluster is not None:
+            return cluster, True
+
+        signature = minhash_signature(shingles(normalized), self.bands * self.rows)
+        keys = list(enumerate(zip(*[iter(signature)] * self.rows)))
+
+        checked = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    self._exact[normalized] = candidate
+                    return candidate, True
+
+        cluster = len(self._signatures)
+        self._signatures.append(signature)
+        self._exact[normalized] = cluster
+        for key in keys:
+            self._buckets.setdefault(key, []).append(cluster)
+        return cluster, False
+
+
+def deduplicate_messages(
+    messages: List[MessageRecord],
+    config: Optional[Dict] = None
+) -> List[MessageRecord]:
+    """
+    Collapse exact and near-duplicate messages across chats.
+
+    The earliest copy of each message is kept and annotated (also_in) with
+    the other chats the same text was posted in. Kept messages stay in
+    their original order.
+
+    Args:
+        messages: Message records from all chats
+        config: Dedup settings
+            - enabled: Whether to deduplicate (default: True)
+            - threshold: Minimum Jaccard similarity (default: 0.8)
+
+    Returns:
+        Deduplicated list of message records
+    """
+    config = config or {}
+    if not messages or not config.get("enabled", True):
+        return messages
+
+    index = NearDuplicateIndex(threshold=config.get("threshold", DEFAULT_THRESHOLD))
+
+    # Earliest copy first, so it becomes the representative
+    order = sorted(range(len(messages)), key=lambda i: messages[i].timestamp)
+    representatives: Dict[int, int] = {}
+    sources: Dict[int, List[str]] = {}
+    keep = [False] * len(messages)
+
+    for i in order:
+        cluster, duplicate = index.add(messages[i].text)
+        if not duplicate:
+            representatives[cluster] = i
+            sources[cluster] = [messages[i].chat_name]
+            keep[i] = True
+        elif messages[i].chat_name not in sources[cluster]:
+            sources[cluster].append(messages[i].chat_name)
+
+    for cluster, i in representatives.items():
+        if len(sources[cluster]) > 1:
+            messages[i].also_in = tuple(sources[cluster][1:])
+
+    deduplicated = [message for i, message in enumerate(messages) if keep[i]]
+    removed = len(messages) - len(deduplicated)
+
+    logger.info(f"Collapsed {removed}/{len(messages)} duplicate messages")
+    return deduplicated
+
+
+class DedupFilter(FilterStage):
+    """Pipeline stage collapsing duplicates across all collected chats."""
+
+    name = "dedup"
+    scope = "run"
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        return deduplicate_messages(messages, self.config.get("dedup"))
@@ -0,0 +1,157 @@
+"""Configurable filter pipeline with per-stage timing and drop counts."""
+
+import time
+from typing import Dict, List, Optional, Type
+
+from src.filters.content_filter import (
+    ExcludePatternFilter,
+    FilterStage,
+    MinLengthFilter,
+    NoTextFilter,
+    merge_rule_hits,
+)
+from src.filters.deduplicator import DedupFilter
+from src.filters.sender_noise import SenderNoiseFilter
+from src.telegram_client.message_record import MessageRecord
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stage name (as used in filters.pipeline) -> stage class
+STAGES: Dict[str, Type[FilterStage]] = {
+    stage.name: stage
+    for stage in (NoTextFilter, MinLengthFilter, ExcludePatternFilter, SenderNoiseFilter, DedupFilter)
+}
+
+# Stage order when filters.pipeline is not configured (cheap stages first)
+DEFAULT_PIPELINE = ["no_text", "min_length", "exclude_patterns", "sender_noise", "dedup"]
+
+
+class FilterPipeline:
+    """
+    Ordered filter stages with per-stage counters.
+
+    Batch stages run on each fetched batch via process_batch(); run stages
+    (such as cross-chat dedup) run once on all collected messages via
+    finish(). For every stage, the number of messages in, messages dropped
+    and wall time are recorded.
+    """
+
+    def __init__(self, stages: List[FilterStage]):
+        """
+        Initialize FilterPipeline.
+
+        Args:
+            stages: Stage instances, in execution order
+        """
+        self.stages = stages
+        self.total = 0
+        self.counters: Dict[str, Dict] = {
+            stage.name: {"input": 0, "dropped": 0, "seconds": 0.0}
+            for stage in stages
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> "FilterPipeline":
+        """
+        Build the pipeline declared in the filters configuration.
+
+        Args:
+            config: The "filters" section of target_chats.yaml; its "pipeline"
+                key lists stage names in order (default: DEFAULT_PIPELINE)
+
+        Returns:
+            FilterPipeline instance
+
+        Raises:
+            ValueError: If a stage name is unknown
+        """
+        config = config or {}
+        names = config.get("pipeline") or DEFAULT_PIPELINE
+
+        unknown = [name for name in names if name not in STAGES]
+        if unknown:
+            raise ValueError(
+                f"Unknown filter stage(s): {', '.join(unknown)} "
+                f"(expected: {', '.join(STAGES)})"
+            )
+
+        return cls([STAGES[name](config) for name in names])
+
+    def process_batch(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        """
+        Run the batch stages on one batch of messages.
+
+        Args:
+            messages: Fetched message records
+
+        Returns:
+            Message records kept by every batch stage
+        """
+        self.total += len(messages)
+        return self._run("batch", messages)
+
+    def finish(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        """
+        Run the run stages on all collected messages.
+
+        Args:
+            messages: Message records kept by the batch stages
+
+        Returns:
+            Final list of message records
+        """
+        return self._run("run", messages)
+
+    def _run(self, scope: str, messages: List[MessageRecord]) -> List[MessageRecord]:
+        """Run the stages of one scope, updating their counters."""
+        for stage in self.stages:
+            if stage.scope != scope or not messages:
+                continue
+
+            counters = self.counters[stage.name]
+            started = time.perf_counter()
+            kept = stage.process(messages)
+            counters["seconds"] += time.perf_counter() - started
+            counters["input"] += len(messages)
+            counters["dropped"] += len(messages) - len(kept)
+            messages = kept
+
+        return messages
+
+    def stats(self) -> Dict:
+        """
+        Get the pipeline statistics.
+
+        Returns:
+            Dictionary with "total" (messages fetched), "stages" (counters per
+            stage name, in pipeline order) and any stage-specific statistics
+        """
+        stats = {
+            "total": self.total,
+            "stages": {name: dict(counters) for name, counters in self.counters.items()},
+        }
+        for stage in self.stages:
+            merge_filter_stats(stats, stage.stats())
+        return stats
+
+
+def merge_filter_stats(target: Dict, stats: Dict) -> None:
+    """
+    Merge pipeline statistics (e.g. from several accounts) into a running total.
+
+    Args:
+        target: Statistics dictionary updated in place
+        stats: Statistics from FilterPipeline.stats()
+    """
+    for key, value in stats.items():
+        if key == "stages":
+            stages = target.setdefault("stages", {})
+            for name, counters in value.items():
+                merged = stages.setdefault(name, {"input": 0, "dropped": 0, "seconds": 0.0})
+                for counter, amount in counters.items():
+                    merged[counter] = merged.get(counter, 0) + amount
+        elif key == "pattern_rules":
+            merge_rule_hits(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
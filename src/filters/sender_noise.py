@@ -0,0 +1,183 @@
+"""Per-sender burst and bot-noise scoring."""
+
+import re
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from src.filters.content_filter import FilterStage
+from src.filters.deduplicator import normalize_text
+from src.telegram_client.message_record import MessageRecord
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Recent fingerprints remembered per sender (bounds memory per sender)
+RECENT_WINDOW = 8
+
+_URL = re.compile(r"https?://\S+|t\.me/\S+", re.IGNORECASE)
+_ADDRESS = re.compile(r"\b0x[0-9a-fA-F]{6,}\b")
+_NUMBER = re.compile(r"[+-]?\d[\d,.:]*")
+_SPACE = re.compile(r"\s+")
+
+
+def message_template(text: str) -> str:
+    """
+    Reduce a message to its template.
+
+    URLs, contract addresses and numbers are replaced by placeholders, so
+    automated posts that differ only in prices, amounts, times or links
+    share one template.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Template string
+    """
+    text = _URL.sub("<url>", text.lower())
+    text = _ADDRESS.sub("<addr>", text)
+    text = _NUMBER.sub("#", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+class SenderStats:
+    """Running statistics for one sender, in constant memory."""
+
+    __slots__ = ("count", "first_ts", "last_ts", "repeats", "template_repeats",
+                 "recent_texts", "recent_templates")
+
+    def __init__(self):
+        self.count = 0
+        self.first_ts = 0
+        self.last_ts = 0
+        self.repeats = 0
+        self.template_repeats = 0
+        self.recent_texts: Deque[int] = deque(maxlen=RECENT_WINDOW)
+        self.recent_templates: Deque[int] = deque(maxlen=RECENT_WINDOW)
+
+    def update(self, message: MessageRecord) -> None:
+        """
+        Add one message to the statistics.
+
+        Args:
+            message: Message record from this sender
+        """
+        text_hash = hash(normalize_text(message.text))
+        template_hash = hash(message_template(message.text))
+
+        if self.count == 0:
+            self.first_ts = message.timestamp
+        self.first_ts = min(self.first_ts, message.timestamp)
+        self.last_ts = max(self.last_ts, message.timestamp)
+        self.count += 1
+
+        if text_hash in self.recent_texts:
+            self.repeats += 1
+        elif template_hash in self.recent_templates:
+            self.template_repeats += 1
+
+        self.recent_texts.append(text_hash)
+        self.recent_templates.append(template_hash)
+
+    def score(self, max_rate_per_hour: float) -> float:
+        """
+        Compute the noise score.
+
+        The score combines the template ratio (messages matching a recent
+        template, i.e. the same text apart from numbers/links), the
+        repetition ratio (exact repeats) and the message rate relative to
+        max_rate_per_hour. A fast but varied human sender scores at most
+        the rate weight.
+
+        Args:
+            max_rate_per_hour: Message rate treated as fully bursty
+
+        Returns:
+            Score between 0 and 1
+        """
+        if self.count < 2:
+            return 0.0
+
+        hours = max((self.last_ts - self.first_ts) / 3600, 1 / 60)
+        rate = min(1.0, self.count / hours / max_rate_per_hour)
+        repetition = self.repeats / (self.count - 1)
+        template = (self.repeats + self.template_repeats) / (self.count - 1)
+
+        return 0.6 * template + 0.2 * repetition + 0.2 * rate
+
+
+class SenderNoiseFilter(FilterStage):
+    """
+    Drops or summarizes senders whose messages look automated.
+
+    Messages are scored per (chat, sender) in one pass in time order. Senders
+    with at least min_messages messages and a score at or above threshold
+    are removed, or replaced by a single summary line (action "summarize").
+    """
+
+    name = "sender_noise"
+    scope = "run"
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        options = config.get("sender_noise", {})
+        self.threshold = options.get("threshold", 0.6)
+        self.min_messages = options.get("min_messages", 5)
+        self.max_rate_per_hour = options.get("max_rate_per_hour", 30)
+        self.action = options.get("action", "summarize")
+
+        if self.action not in ("drop", "summarize"):
+            raise ValueError(
+                f"Unknown sender_noise action '{self.action}' (expected: drop, summarize)"
+            )
+
+    def process(self, messages: List[MessageRecord]) -> List[MessageRecord]:
+        senders: Dict[Tuple[str, str], SenderStats] = {}
+        for message in sorted(messages, key=lambda m: m.timestamp):
+            key = (message.chat_name, message.sender)
+            if key not in senders:
+                senders[key] = SenderStats()
+            senders[key].update(message)
+
+        noisy = {
+            key: stats
+            for key, stats in senders.items()
+            if stats.count >= self.min_messages
+            and stats.score(self.max_rate_per_hour) >= self.threshold
+        }
+        if not noisy:
+            return messages
+
+        for (chat_name, sender), stats in noisy.items():
+            logger.info(
+                f"Noisy sender {sender} in {chat_name}: {stats.count} message(s), "
+                f"score {stats.score(self.max_rate_per_hour):.2f} ({self.action})"
+            )
+
+        kept = []
+        summarized = set()
+        for message in messages:
+            key = (message.chat_name, message.sender)
+            if key not in noisy:
+                kept.append(message)
+            elif self.action == "summarize" and key not in summarized:
+                summarized.add(key)
+                kept.append(self._summary(message, noisy[key].count))
+
+        return kept
+
+    @staticmethod
+    def _summary(message: MessageRecord, count: int) -> MessageRecord:
+        """Build the one-line stand-in for a noisy sender's messages."""
+        example = message.text.strip().replace("\n", " ")
+        if len(example) > 200:
+            example = example[:200] + "..."
+
+        return MessageRecord(
+            message_id=message.message_id,
+            chat_id=message.chat_id,
+            chat_name=message.chat_name,
+            sender=message.sender,
+            text=f"[自動投稿と思われる類似メッセージ {count}件を省略] 例: {example}",
+            timestamp=message.timestamp
+        )
@@ -7,7 +7,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -16,13 +16,26 @@ sys.path.insert(0, str(project_root))
 from config.settings import Settings
 from src.ai_processor.content_organizer import ContentOrganizer
 from src.ai_processor.gemini_client import GeminiClient
+from src.ai_processor.quota_planner import QuotaPlanner
+from src.ai_processor.theme_clusterer import build_theme_document
 from src.document.google_docs_client import GoogleDocsClient
 from src.document.markdown_builder import MarkdownBuilder
-from src.filters.content_filter import filter_messages
+from src.filters.pipeline import FilterPipeline, merge_filter_stats
 from src.storage.state_manager import StateManager
+from src.telegram_client.accounts import assign_chats, peer_namespace
+from src.telegram_client.backfill import Backfiller
 from src.telegram_client.client import TelegramClient
-from src.telegram_client.message_fetcher import MessageFetcher
+from src.telegram_client.dialog_probe import DialogProbe
+from src.telegram_client.entity_cache import EntityCache
+from src.telegram_client.listener import MessageListener
+from src.telegram_client.message_fetcher import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_INITIAL_WINDOW,
+    MessageFetcher,
+)
+from src.telegram_client.message_record import MessageRecord
 from src.telegram_client.message_reader import MessageReader
+from src.telegram_client.sender_cache import SenderCache
 from src.utils.error_handler import (
     ErrorContext,
     GeminiRateLimitError,
@@ -37,48 +50,91 @@ async def process_chat(
     chat_config: Dict,
     telegram_client: TelegramClient,
     state_manager: StateManager,
-    dry_run: bool = False
-) -> List[Dict]:
+    dry_run: bool = False,
+    entity_cache: Optional[EntityCache] = None,
+    initial_window: str = DEFAULT_INITIAL_WINDOW,
+    pipeline: Optional[FilterPipeline] = None,
+    sender_cache: Optional[SenderCache] = None,
+    from_buffer: bool = False
+) -> List[MessageRecord]:
     """
     Process a single chat: fetch new messages and mark as read.
 
+    Messages are streamed from Telegram in batches, or read from the
+    listener buffer when from_buffer is set. When a filter pipeline is
+    given, each batch goes through its batch stages as it arrives so that
+    only kept messages are held in memory.
+
     Args:
         chat_config: Chat configuration dictionary
         telegram_client: Connected Telegram client
         state_manager: State manager instance
         dry_run: If True, don't mark messages as read or update state
+        entity_cache: Shared entity cache (default: persistent cache in state_manager)
+        initial_window: First-run look-back window, unless the chat sets initial_window
+        pipeline: Filter pipeline applied to each batch (None = keep everything)
+        sender_cache: Shared sender name cache (default: persistent cache in state_manager)
+        from_buffer: If True, read messages buffered by --listen instead of fetching history
 
     Returns:
-        List of new messages
+        List of new messages (after filtering, if a pipeline is given)
     """
     chat_id = chat_config.get("chat_id")
     chat_name = chat_config.get("name", chat_id)
 
     logger.info(f"Processing chat: {chat_name} ({chat_id})")
 
-    # Initialize fetcher and reader
-    fetcher = MessageFetcher(telegram_client.client)
-    reader = MessageReader(telegram_client.client)
+    # Initialize fetcher and reader sharing one entity cache
+    if entity_cache is None:
+        entity_cache = EntityCache(telegram_client.api, state_manager)
+    if sender_cache is None:
+        sender_cache = SenderCache(telegram_client.api, state_manager)
+    initial_window = chat_config.get("initial_window", initial_window)
+    fetcher = MessageFetcher(
+        telegram_client.api,
+        entity_cache,
+        initial_window,
+        sender_cache=sender_cache
+    )
+    reader = MessageReader(telegram_client.api, entity_cache)
 
     # Get last processed message ID
     last_message_id = state_manager.get_last_message_id(chat_id)
 
     if last_message_id:
         logger.info(f"Last processed message ID: {last_message_id}")
+    elif not from_buffer:
+        logger.info(f"First run for this chat - will fetch window {initial_window}")
+
+    if from_buffer:
+        # Messages were already collected by the listener: no history scan
+        batches = buffered_batches(state_manager, chat_id, last_message_id)
     else:
-        logger.info("First run for this chat - will fetch last 24 hours")
+        batches = fetcher.iter_message_batches(chat_id, last_message_id)
+
+    # Stream new messages, filtering each batch as it arrives
+    messages = []
+    fetched_count = 0
+    latest_message_id = None
 
-    # Fetch new messages
-    messages = await fetcher.fetch_new_messages(chat_id, last_message_id)
+    async for batch in batches:
+        fetched_count += len(batch)
+        batch_latest_id = max(msg.message_id for msg in batch)
+        if latest_message_id is None or batch_latest_id > latest_message_id:
+            latest_message_id = batch_latest_id
 
-    if not messages:
+        if pipeline is not None:
+            batch = pipeline.process_batch(batch)
+        messages.extend(batch)
+
+    if not fetched_count:
         logger.info(f"No new messages in {chat_name}")
         return []
 
-    logger.info(f"Fetched {len(messages)} new messages from {chat_name}")
-
-    # Get latest message ID for state update
-    latest_message_id = max(msg["message_id"] for msg in messages)
+    logger.info(
+        f"Fetched {fetched_count} new messages from {chat_name} "
+        f"({len(messages)} kept)"
+    )
 
     if not dry_run:
         # Mark messages as read
@@ -91,12 +147,332 @@ async def process_chat(
         # Update state
         state_manager.update_message_id(chat_id, latest_message_id, chat_name)
         logger.info(f"Updated state with latest message ID: {latest_message_id}")
+
+        if from_buffer:
+            state_manager.delete_buffered_messages(chat_id, latest_message_id)
     else:
         logger.info("[DRY RUN] Would mark messages as read and update state")
 
     return messages
 
 
+async def buffered_batches(
+    state_manager: StateManager,
+    chat_id: str,
+    last_message_id: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[List[MessageRecord]]:
+    """
+    Yield a chat's buffered listener messages in batches.
+
+    Args:
+        state_manager: State manager holding the message buffer
+        chat_id: Configured chat ID
+        last_message_id: Messages up to this ID are skipped (already processed)
+        batch_size: Maximum number of messages per batch
+
+    Yields:
+        Lists of at most batch_size message records
+    """
+    records = [
+        MessageRecord(**row) for row in state_manager.get_buffered_messages(chat_id)
+        if last_message_id is None or row["message_id"] > last_message_id
+    ]
+
+    for start in range(0, len(records), batch_size):
+        yield records[start:start + batch_size]
+
+
+async def skip_idle_chats(
+    chat_configs: List[Dict],
+    probe: DialogProbe,
+    state_manager: StateManager
+) -> List[Dict]:
+    """
+    Drop chats that have nothing new since their last processed message.
+
+    Chats without stored state, or missing from the probe result, are kept.
+    If the probe itself fails, all chats are kept.
+
+    A chat is idle when its top message ID is not above the last processed
+    one. That is all the history fetch would look for: it only reads
+    messages with a higher ID, so edits and deletions of older messages are
+    not collected either way. Unread counts are not used, as they depend on
+    what the account has read in other clients.
+
+    Args:
+        chat_configs: List of chat configuration dictionaries
+        probe: Dialog probe for the connected client
+        state_manager: State manager instance
+
+    Returns:
+        Chat configurations that still need a history fetch
+    """
+    try:
+        status = await probe.probe([str(c.get("chat_id")) for c in chat_configs])
+    except Exception as e:
+        logger.warning(f"Dialog probe failed, fetching all chats: {e}")
+        return chat_configs
+
+    active_configs = []
+    for chat_config in chat_configs:
+        chat_id = str(chat_config.get("chat_id"))
+        dialog = status.get(chat_id)
+        last_message_id = state_manager.get_last_message_id(chat_id)
+
+        if dialog and last_message_id and dialog["top_message"] <= last_message_id:
+            logger.info(
+                f"Skipping idle chat {chat_config.get('name', chat_id)} "
+                f"(top message {dialog['top_message']})"
+            )
+            continue
+
+        active_configs.append(chat_config)
+
+    logger.info(f"{len(chat_configs) - len(active_configs)} idle chat(s) skipped")
+    return active_configs
+
+
+async def collect_messages(
+    chat_configs: List[Dict],
+    telegram_client: TelegramClient,
+    state_manager: StateManager,
+    max_concurrency: int = 5,
+    dry_run: bool = False,
+    initial_window: str = DEFAULT_INITIAL_WINDOW,
+    pipeline: Optional[FilterPipeline] = None,
+    entity_cache: Optional[EntityCache] = None,
+    sender_cache: Optional[SenderCache] = None,
+    from_buffer: bool = False
+) -> Tuple[List[MessageRecord], Dict[str, float]]:
+    """
+    Collect new messages from all chats concurrently.
+
+    Chats are processed in parallel, with at most max_concurrency chats
+    in flight at once. A failure in one chat is logged and does not affect
+    the others. Results are merged in the order of chat_configs.
+
+    Before any history request, all chats are probed with one bulk dialog
+    request and chats whose top message is not newer than the stored
+    last_message_id are skipped. The probe is not needed (and skipped)
+    when reading from the listener buffer.
+
+    Args:
+        chat_configs: List of chat configuration dictionaries
+        telegram_client: Connected Telegram client
+        state_manager: State manager instance
+        max_concurrency: Maximum number of chats processed at once
+        dry_run: If True, don't mark messages as read or update state
+        initial_window: Default first-run look-back window
+        pipeline: Filter pipeline applied to each fetched batch (None = keep everything)
+        entity_cache: Shared entity cache (default: persistent cache in state_manager)
+        sender_cache: Shared sender name cache (default: persistent cache in state_manager)
+        from_buffer: If True, read messages buffered by --listen instead of fetching history
+
+    Returns:
+        Tuple of (merged message list, per-chat elapsed seconds keyed by chat name)
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    if entity_cache is None:
+        entity_cache = EntityCache(telegram_client.api, state_manager)
+    if sender_cache is None:
+        sender_cache = SenderCache(telegram_client.api, state_manager)
+
+    async def run_one(chat_config: Dict) -> Tuple[List[MessageRecord], float]:
+        chat_name = chat_config.get("name", chat_config.get("chat_id"))
+
+        async with semaphore:
+            chat_start = time.monotonic()
+            messages: List[MessageRecord] = []
+
+            with ErrorContext(
+                f"Processing chat {chat_name}",
+                raise_on_error=False  # Continue with other chats if one fails
+            ):
+                messages = await process_chat(
+                    chat_config,
+                    telegram_client,
+                    state_manager,
+                    dry_run=dry_run,
+                    entity_cache=entity_cache,
+                    initial_window=initial_window,
+                    pipeline=pipeline,
+                    sender_cache=sender_cache,
+                    from_buffer=from_buffer
+                )
+
+            return messages, time.monotonic() - chat_start
+
+    if not from_buffer:
+        chat_configs = await skip_idle_chats(
+            chat_configs,
+            DialogProbe(telegram_client.api, entity_cache),
+            state_manager
+        )
+
+    logger.info(
+        f"Collecting from {len(chat_configs)} chat(s) "
+        f"(max concurrency: {max_concurrency})"
+    )
+
+    results = await asyncio.gather(*(run_one(c) for c in chat_configs))
+
+    # Merge in configuration order so output is stable across runs
+    all_messages = []
+    chat_timings: Dict[str, float] = {}
+    for chat_config, (messages, elapsed) in zip(chat_configs, results):
+        all_messages.extend(messages)
+        chat_timings[chat_config.get("name", chat_config.get("chat_id"))] = elapsed
+
+    for chat_name, elapsed in chat_timings.items():
+        logger.info(f"Chat timing: {chat_name} - {elapsed:.2f}s")
+
+    return all_messages, chat_timings
+
+
+async def run_backfill(
+    chat_configs: List[Dict],
+    settings: Settings,
+    telegram_client: TelegramClient,
+    state_manager: StateManager,
+    entity_cache: EntityCache,
+    sender_cache: SenderCache
+) -> None:
+    """
+    Backfill chats into the message buffer, one chat at a time.
+
+    Progress is checkpointed, so an interrupted backfill resumes where it
+    stopped on the next --backfill run.
+
+    Args:
+        chat_configs: Chat configuration dictionaries to backfill
+        settings: Loaded settings
+        telegram_client: Connected Telegram client
+        state_manager: State manager instance
+        entity_cache: Shared entity cache
+        sender_cache: Shared sender name cache
+    """
+    for chat_config in chat_configs:
+        with ErrorContext(
+            f"Backfilling chat {chat_config.get('name')}",
+            raise_on_error=False  # Continue with other chats if one fails
+        ):
+            initial_window = chat_config.get("initial_window", settings.initial_fetch_window)
+            fetcher = MessageFetcher(
+                telegram_client.api,
+                entity_cache,
+                initial_window,
+                sender_cache=sender_cache
+            )
+            backfiller = Backfiller(
+                fetcher,
+                entity_cache,
+                state_manager,
+                chunk_size=settings.backfill_chunk_size,
+                checkpoint_every=settings.backfill_checkpoint_every,
+                pacing_seconds=settings.backfill_pacing_seconds,
+                initial_window=initial_window
+            )
+            await backfiller.backfill_chat(chat_config.get("chat_id"))
+
+
+async def collect_account(
+    account: Dict,
+    chat_configs: List[Dict],
+    settings: Settings,
+    state_manager: StateManager,
+    args
+) -> Dict:
+    """
+    Connect one Telegram account and collect messages from its chats.
+
+    Args:
+        account: Account dictionary from Settings.telegram_accounts
+        chat_configs: Chat configurations assigned to this account
+        settings: Loaded settings
+        state_manager: State manager instance
+        args: Parsed command line arguments
+
+    Returns:
+        Report dictionary with the account's messages, timings and statistics
+    """
+    telegram_client = TelegramClient(
+        api_id=account["api_id"],
+        api_hash=account["api_hash"],
+        phone_number=account["phone_number"],
+        session_name=account["session_name"],
+        max_concurrency=settings.max_concurrent_chats,
+        session_mode=settings.telegram_session_mode
+    )
+
+    async with telegram_client:
+        logger.info(f"Connected to Telegram successfully (account: {account['name']})")
+
+        # Collect messages from the account's chats, filtering them as they stream in
+        entity_cache = EntityCache(
+            telegram_client.api,
+            state_manager,
+            namespace=peer_namespace(account)
+        )
+        sender_cache = SenderCache(
+            telegram_client.api,
+            state_manager,
+            ttl_hours=settings.sender_cache_ttl_hours
+        )
+        pipeline = FilterPipeline.from_config(settings.filters)
+
+        if args.backfill:
+            if args.dry_run:
+                logger.info("[DRY RUN] Would backfill history into the message buffer")
+            else:
+                await run_backfill(
+                    chat_configs,
+                    settings,
+                    telegram_client,
+                    state_manager,
+                    entity_cache,
+                    sender_cache
+                )
+
+        messages, chat_timings = await collect_messages(
+            chat_configs,
+            telegram_client,
+            state_manager,
+            max_concurrency=settings.max_concurrent_chats,
+            dry_run=args.dry_run,
+            initial_window=settings.initial_fetch_window,
+            pipeline=pipeline,
+            entity_cache=entity_cache,
+            sender_cache=sender_cache,
+            from_buffer=args.from_buffer or args.backfill
+        )
+
+    if not args.dry_run:
+        state_manager.update_account_state(
+            account["name"],
+            chats_assigned=len(chat_configs),
+            messages_fetched=pipeline.total,
+            flood_waits=telegram_client.api.flood_count,
+            connect_latency_ms=telegram_client.connect_latency_ms
+        )
+
+    return {
+        "account": account["name"],
+        "chats": len(chat_configs),
+        "messages": messages,
+        "chat_timings": chat_timings,
+        "filter_stats": pipeline.stats(),
+        "connect_latency_ms": telegram_client.connect_latency_ms,
+        "session_mode": telegram_client.session_mode,
+        "flood_count": telegram_client.api.flood_count,
+        "flood_wait_seconds": telegram_client.api.flood_wait_seconds,
+        "entity_hits": entity_cache.hits,
+        "entity_misses": entity_cache.misses,
+        "sender_hits": sender_cache.hits,
+        "sender_misses": sender_cache.misses,
+    }
+
+
 async def main_async(args) -> int:
     """
     Main async function that orchestrates the entire workflow.
@@ -124,99 +500,158 @@ async def main_async(args) -> int:
         logger.info("Initializing components...")
         state_manager = StateManager()
 
-        # Check Gemini API rate limit
+        # Check Gemini API quota (from the per-call ledger)
+        call_budget = None
         if not args.dry_run:
-            api_calls_today = state_manager.get_gemini_api_call_count_today()
-            logger.info(f"Gemini API calls today: {api_calls_today}/20")
+            quota_planner = QuotaPlanner(
+                state_manager,
+                daily_limit=settings.gemini_daily_call_limit,
+                quota_timezone=settings.gemini_quota_timezone
+            )
+            call_budget = quota_planner.remaining()
 
-            if api_calls_today >= 20:
-                logger.error("Gemini API rate limit reached (20 calls/day)")
-                raise GeminiRateLimitError(
-                    "Daily Gemini API limit reached. Please try again tomorrow."
-                )
+            if call_budget <= 0:
+                logger.error(f"Gemini API quota used up ({settings.gemini_daily_call_limit} calls/day)")
+                if not settings.gemini_local_fallback:
+                    raise GeminiRateLimitError(
+                        "Daily Gemini API limit reached. Please try again after the quota resets."
+                    )
+                logger.warning("Messages will be organized locally (theme clustering)")
+
+        # Assign chats to Telegram accounts and fetch with all of them in parallel
+        accounts = settings.telegram_accounts
+        assignments = assign_chats(
+            settings.enabled_chats,
+            [account["name"] for account in accounts],
+            settings.account_policy
+        )
 
-        # Connect to Telegram
         logger.info("Connecting to Telegram...")
-        telegram_client = TelegramClient(
-            api_id=settings.telegram_api_id,
-            api_hash=settings.telegram_api_hash,
-            phone_number=settings.telegram_phone_number
+        active_accounts = [account for account in accounts if assignments[account["name"]]]
+        results = await asyncio.gather(*(
+            collect_account(account, assignments[account["name"]], settings, state_manager, args)
+            for account in active_accounts
+        ), return_exceptions=True)
+
+        # A failed account must not discard what the others already fetched
+        # (and marked as read), so its report is skipped instead
+        account_reports = []
+        for account, result in zip(active_accounts, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Account {account['name']} failed: {result}", exc_info=result)
+            else:
+                account_reports.append(result)
+
+        if active_accounts and not account_reports:
+            raise results[0]
+
+        # Merge account results into one pipeline
+        filtered_messages: List[MessageRecord] = []
+        chat_timings: Dict[str, float] = {}
+        filter_stats: Dict[str, Any] = {}
+        for report in account_reports:
+            filtered_messages.extend(report["messages"])
+            chat_timings.update(report["chat_timings"])
+            merge_filter_stats(filter_stats, report["filter_stats"])
+
+        # Run the stages that need every chat at once (e.g. cross-chat dedup)
+        run_pipeline = FilterPipeline.from_config(settings.filters)
+        filtered_messages = run_pipeline.finish(filtered_messages)
+        merge_filter_stats(filter_stats, run_pipeline.stats())
+        filter_stages = filter_stats.get("stages", {})
+
+        total_messages = filter_stats.get("total", 0)
+        logger.info(f"Total messages collected: {total_messages}")
+        logger.info(
+            f"Messages after filtering: {len(filtered_messages)} ("
+            + ", ".join(f"{name}: {counters['dropped']}" for name, counters in filter_stages.items())
+            + ")"
         )
-
-        async with telegram_client:
-            logger.info("Connected to Telegram successfully")
-
-            # Collect messages from all chats
-            all_messages = []
-
-            for chat_config in settings.enabled_chats:
-                with ErrorContext(
-                    f"Processing chat {chat_config.get('name')}",
-                    raise_on_error=False  # Continue with other chats if one fails
-                ):
-                    messages = await process_chat(
-                        chat_config,
-                        telegram_client,
-                        state_manager,
-                        dry_run=args.dry_run
-                    )
-                    all_messages.extend(messages)
-
-            logger.info(f"Total messages collected: {len(all_messages)}")
-
-            if not all_messages:
-                logger.info("No new messages to process")
-
-                # Log this run
-                if not args.dry_run and not args.test:
-                    state_manager.add_processing_log(
-                        execution_date=datetime.now().date().isoformat(),
-                        total_messages=0,
-                        filtered_messages=0,
-                        status="SUCCESS",
-                        processing_time_ms=int((time.time() - start_time) * 1000)
-                    )
-
-                return 0
-
-        # Filter messages
-        logger.info("Filtering messages...")
-        filtered_messages = filter_messages(all_messages, settings.filters)
-        logger.info(f"Messages after filtering: {len(filtered_messages)}")
+        for name, counters in filter_stages.items():
+            logger.debug(
+                f"Filter stage {name}: {counters['input']} in, "
+                f"{counters['dropped']} dropped, {counters['seconds']:.3f}s"
+            )
+        top_rules = sorted(filter_stats.get("pattern_rules", {}).items(), key=lambda item: -item[1])[:5]
+        if top_rules:
+            logger.info(
+                "Top exclude patterns: " + ", ".join(f"'{rule}' ({count})" for rule, count in top_rules)
+            )
 
         if not filtered_messages:
-            logger.info("No messages remaining after filtering")
+            if total_messages:
+                logger.info("No messages remaining after filtering")
+            else:
+                logger.info("No new messages to process")
 
             # Log this run
             if not args.dry_run and not args.test:
                 state_manager.add_processing_log(
                     execution_date=datetime.now().date().isoformat(),
-                    total_messages=len(all_messages),
+                    total_messages=total_messages,
                     filtered_messages=0,
                     status="SUCCESS",
-                    processing_time_ms=int((time.time() - start_time) * 1000)
+                    processing_time_ms=int((time.time() - start_time) * 1000),
+                    filter_stages=filter_stages
                 )
 
             return 0
 
-        # Process with Gemini AI
+        # Process with Gemini AI, streaming the document into the Markdown backup
+        markdown_builder = MarkdownBuilder(
+            retention_days=settings.markdown_backup_retention_days
+        )
+        gemini_client = None
         if args.dry_run:
             logger.info("[DRY RUN] Would organize messages with Gemini AI")
             organized_content = f"# Dry Run\n\n{len(filtered_messages)} messages would be processed"
+            markdown_path = markdown_builder.save_markdown(organized_content)
+        elif call_budget <= 0:
+            logger.info("Organizing messages locally (Gemini quota used up)...")
+            organized_content = build_theme_document(
+                filtered_messages,
+                note="Gemini APIの1日の上限に達したため、ローカルでテーマ分類しています"
+            )
+            markdown_path = markdown_builder.save_markdown(organized_content)
         else:
             logger.info("Organizing messages with Gemini AI...")
-            gemini_client = GeminiClient(api_key=settings.gemini_api_key)
-            organizer = ContentOrganizer(gemini_client)
-            organized_content = organizer.organize_messages(filtered_messages)
-            logger.info("Messages organized successfully")
-
-        # Save Markdown
-        logger.info("Saving Markdown...")
-        markdown_builder = MarkdownBuilder(
-            retention_days=settings.markdown_backup_retention_days
-        )
-        markdown_path = markdown_builder.save_markdown(organized_content)
-        logger.info(f"Markdown saved to: {markdown_path}")
+            gemini_client = GeminiClient(
+                api_key=settings.gemini_api_key,
+                state_manager=state_manager,
+                cache_max_age_hours=settings.gemini_cache_max_age_hours,
+                cache_max_mb=settings.gemini_cache_max_mb,
+                max_concurrency=settings.gemini_max_concurrency,
+                timeout=settings.gemini_timeout_seconds
+            )
+            gemini_client.call_budget = call_budget
+            organizer = ContentOrganizer(
+                gemini_client,
+                token_budget=settings.gemini_token_budget,
+                chunk_tokens=settings.gemini_chunk_tokens
+            )
+            backup = markdown_builder.open_stream()
+            try:
+                organized_content = await organizer.organize_messages(
+                    filtered_messages,
+                    max_calls=call_budget,
+                    on_chunk=backup.write
+                )
+            except Exception as e:
+                backup.abort()
+                if not settings.gemini_local_fallback:
+                    raise
+                logger.error(f"Gemini organization failed ({e}) - organizing messages locally")
+                organized_content = build_theme_document(
+                    filtered_messages,
+                    note="Gemini APIでの整理に失敗したため、ローカルでテーマ分類しています"
+                )
+                markdown_path = markdown_builder.save_markdown(organized_content)
+            except BaseException:
+                backup.abort()
+                raise
+            else:
+                markdown_path = backup.commit()
+                logger.info("Messages organized successfully")
 
         # Upload to Google Docs
         document_id = None
@@ -258,12 +693,13 @@ async def main_async(args) -> int:
 
             state_manager.add_processing_log(
                 execution_date=datetime.now().date().isoformat(),
-                total_messages=len(all_messages),
+                total_messages=total_messages,
                 filtered_messages=len(filtered_messages),
                 status="SUCCESS",
                 document_id=document_id,
                 document_url=document_url,
-                processing_time_ms=processing_time_ms
+                processing_time_ms=processing_time_ms,
+                filter_stages=filter_stages
             )
 
             logger.info(f"Processing complete in {processing_time_ms}ms")
@@ -273,8 +709,36 @@ async def main_async(args) -> int:
         logger.info("=" * 60)
         logger.info("Processing Summary")
         logger.info("=" * 60)
-        logger.info(f"Total messages collected: {len(all_messages)}")
+        logger.info(f"Total messages collected: {total_messages}")
         logger.info(f"Messages after filtering: {len(filtered_messages)}")
+        if chat_timings:
+            slowest_chat = max(chat_timings, key=chat_timings.get)
+            logger.info(
+                f"Chat fetch time: {sum(chat_timings.values()):.2f}s total, "
+                f"slowest {slowest_chat} ({chat_timings[slowest_chat]:.2f}s)"
+            )
+        for report in account_reports:
+            logger.info(
+                f"Account {report['account']}: {report['chats']} chat(s), "
+                f"{report['filter_stats'].get('total', 0)} message(s), "
+                f"connect {report['connect_latency_ms']}ms ({report['session_mode']} session), "
+                f"flood waits {report['flood_count']} ({report['flood_wait_seconds']}s)"
+            )
+            logger.info(
+                f"Account {report['account']} caches: "
+                f"entity {report['entity_hits']} hit(s) / {report['entity_misses']} miss(es), "
+                f"sender {report['sender_hits']} hit(s) / {report['sender_misses']} miss(es)"
+            )
+        if gemini_client:
+            logger.info(f"Gemini API calls: {gemini_client.api_calls} of {call_budget} remaining today")
+            if organizer.encoding_report.verbose_tokens:
+                logger.info(f"Prompt message tokens: {organizer.encoding_report.summary()}")
+        if gemini_client and gemini_client.cache_hit_rate is not None:
+            logger.info(
+                f"Gemini cache: {gemini_client.cache_hits} hit(s) / "
+                f"{gemini_client.cache_misses} miss(es) "
+                f"({gemini_client.cache_hit_rate:.0%} hit rate)"
+            )
         logger.info(f"Markdown saved: {markdown_path}")
         if document_url:
             logger.info(f"Google Doc URL: {document_url}")
@@ -308,6 +772,70 @@ async def main_async(args) -> int:
         return 1
 
 
+async def listen_async(args) -> int:
+    """
+    Run the real-time listener until disconnected.
+
+    New messages from the enabled chats are appended to the durable
+    message buffer, which a later run with --from-buffer consumes.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    try:
+        settings = Settings()
+        settings.validate()
+
+        state_manager = StateManager()
+        accounts = settings.telegram_accounts
+        assignments = assign_chats(
+            settings.enabled_chats,
+            [account["name"] for account in accounts],
+            settings.account_policy
+        )
+
+        async def listen_account(account: Dict) -> None:
+            telegram_client = TelegramClient(
+                api_id=account["api_id"],
+                api_hash=account["api_hash"],
+                phone_number=account["phone_number"],
+                session_name=account["session_name"],
+                max_concurrency=settings.max_concurrent_chats,
+                session_mode=settings.telegram_session_mode
+            )
+
+            async with telegram_client:
+                listener = MessageListener(
+                    telegram_client,
+                    state_manager,
+                    assignments[account["name"]],
+                    catchup_limit=settings.listener_catchup_limit,
+                    account=peer_namespace(account)
+                )
+                await listener.run()
+
+        active_accounts = [account for account in accounts if assignments[account["name"]]]
+        results = await asyncio.gather(*(
+            listen_account(account) for account in active_accounts
+        ), return_exceptions=True)
+
+        # Listeners run independently; one failing account does not stop the others
+        failed = 0
+        for account, result in zip(active_accounts, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Listener for account {account['name']} failed: {result}", exc_info=result)
+                failed += 1
+
+        return 1 if failed else 0
+
+    except Exception as e:
+        logger.error(f"Listener failed: {e}", exc_info=True)
+        return 1
+
+
 def main():
     """Main entry point with argument parsing."""
     parser = argparse.ArgumentParser(
@@ -323,9 +851,28 @@ def main():
         action="store_true",
         help="Dry run: don't mark messages as read or update state"
     )
+    parser.add_argument(
+        "--listen",
+        action="store_true",
+        help="Listener daemon: buffer new messages continuously until stopped"
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Resumable catch-up: page through history with checkpoints, then build the digest"
+    )
+    parser.add_argument(
+        "--from-buffer",
+        action="store_true",
+        help="Build the digest from messages buffered by --listen (no history scan)"
+    )
 
     args = parser.parse_args()
 
+    if args.listen:
+        logger.info("Running in LISTEN mode")
+        sys.exit(asyncio.run(listen_async(args)))
+
     # Log mode
     if args.dry_run:
         logger.info("Running in DRY RUN mode")
@@ -1,7 +1,7 @@
 """State management module using SQLite for message_id tracking and processing logs."""
 
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -73,9 +73,134 @@ class StateManager:
                 )
             """)
 
+            # Create gemini_call_log table (one row per Gemini API attempt)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS gemini_call_log (
+                    call_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    called_at TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    response_tokens INTEGER NOT NULL,
+                    latency_ms INTEGER NOT NULL,
+                    outcome TEXT NOT NULL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gemini_call_log_called_at
+                ON gemini_call_log(called_at)
+            """)
+
+            # Create filter_stage_log table (per-stage filter counters per run)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS filter_stage_log (
+                    log_id INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    input_messages INTEGER NOT NULL,
+                    dropped_messages INTEGER NOT NULL,
+                    elapsed_ms REAL NOT NULL,
+                    PRIMARY KEY (log_id, stage)
+                )
+            """)
+
+            # Create gemini_cache table (Gemini responses by prompt hash)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS gemini_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used_at TEXT NOT NULL
+                )
+            """)
+
+            # Create entity_cache table (resolved input peers per chat)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS entity_cache (
+                    chat_id TEXT PRIMARY KEY,
+                    peer_type TEXT NOT NULL,
+                    peer_id INTEGER NOT NULL,
+                    access_hash INTEGER,
+                    chat_name TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Create sender_cache table (display names by user ID)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sender_cache (
+                    user_id INTEGER PRIMARY KEY,
+                    sender_name TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Create message_buffer table (messages received by the listener)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS message_buffer (
+                    chat_id TEXT NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    peer_id INTEGER,
+                    chat_name TEXT NOT NULL,
+                    sender TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    received_at TEXT NOT NULL,
+                    replies INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (chat_id, message_id)
+                )
+            """)
+
+            # Create backfill_checkpoint table (resume points for --backfill)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_checkpoint (
+                    chat_id TEXT PRIMARY KEY,
+                    high_water_message_id INTEGER NOT NULL,
+                    messages_buffered INTEGER NOT NULL,
+                    completed INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Create catchup_gap table (listener catch-ups stopped at the limit)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS catchup_gap (
+                    chat_id TEXT PRIMARY KEY,
+                    resume_message_id INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Create account_state table (per-account ingestion stats)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS account_state (
+                    account TEXT PRIMARY KEY,
+                    chats_assigned INTEGER NOT NULL,
+                    messages_fetched INTEGER NOT NULL,
+                    flood_waits INTEGER NOT NULL,
+                    connect_latency_ms INTEGER,
+                    last_run_at TEXT NOT NULL
+                )
+            """)
+
+            self._add_missing_columns(cursor)
+
             conn.commit()
             logger.debug("Database tables created/verified")
 
+    @staticmethod
+    def _add_missing_columns(cursor: sqlite3.Cursor) -> None:
+        """Add columns introduced after a table was first created."""
+        cursor.execute("PRAGMA table_info(message_buffer)")
+        columns = {row["name"] for row in cursor.fetchall()}
+        if "replies" not in columns:
+            cursor.execute(
+                "ALTER TABLE message_buffer ADD COLUMN replies INTEGER NOT NULL DEFAULT 0"
+            )
+            logger.info("Added replies column to message_buffer")
+
     def get_last_message_id(self, chat_id: str) -> Optional[int]:
         """
         Get the last processed message_id for a chat.
@@ -168,7 +293,8 @@ class StateManager:
         document_id: Optional[str] = None,
         document_url: Optional[str] = None,
         error_message: Optional[str] = None,
-        processing_time_ms: Optional[int] = None
+        processing_time_ms: Optional[int] = None,
+        filter_stages: Optional[Dict[str, Dict]] = None
     ) -> int:
         """
         Add a processing log entry.
@@ -183,6 +309,8 @@ class StateManager:
             document_url: Google Docs document URL (optional)
             error_message: Error message if status is FAILED (optional)
             processing_time_ms: Total processing time in milliseconds (optional)
+            filter_stages: Filter pipeline counters keyed by stage name, each with
+                "input", "dropped" and "seconds" (optional)
 
         Returns:
             ID of the inserted log entry
@@ -218,6 +346,17 @@ class StateManager:
             ))
 
             log_id = cursor.lastrowid
+
+            if filter_stages:
+                cursor.executemany("""
+                    INSERT INTO filter_stage_log (
+                        log_id, stage, input_messages, dropped_messages, elapsed_ms
+                    ) VALUES (?, ?, ?, ?, ?)
+                """, [
+                    (log_id, stage, counters["input"], counters["dropped"], counters["seconds"] * 1000)
+                    for stage, counters in filter_stages.items()
+                ])
+
             conn.commit()
 
             logger.info(
@@ -261,29 +400,539 @@ class StateManager:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
 
-    def get_gemini_api_call_count_today(self) -> int:
+    def get_filter_stage_log(self, log_id: int) -> List[Dict]:
         """
-        Get the number of Gemini API calls made today.
+        Get the filter stage counters recorded for a processing run.
+
+        Args:
+            log_id: Processing log entry ID
 
         Returns:
-            Number of successful processing runs today
+            List of dictionaries with stage, input_messages, dropped_messages
+            and elapsed_ms
         """
-        today = datetime.now().date().isoformat()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT stage, input_messages, dropped_messages, elapsed_ms
+                FROM filter_stage_log
+                WHERE log_id = ?
+                ORDER BY rowid
+            """, (log_id,))
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    def record_gemini_call(
+        self,
+        model: str,
+        prompt_tokens: int,
+        response_tokens: int,
+        latency_ms: int,
+        outcome: str
+    ) -> None:
+        """
+        Record one Gemini API attempt in the call ledger.
+
+        Args:
+            model: Model name
+            prompt_tokens: Estimated prompt tokens
+            response_tokens: Estimated response tokens (0 if none)
+            latency_ms: Time until the response or error in milliseconds
+            outcome: success, empty, timeout, rate_limited, quota_exhausted,
+                auth_error or error
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT COUNT(*) as count
-                FROM processing_log
-                WHERE execution_date = ?
-                AND status = 'SUCCESS'
-            """, (today,))
+                INSERT INTO gemini_call_log (
+                    called_at,
+                    model,
+                    prompt_tokens,
+                    response_tokens,
+                    latency_ms,
+                    outcome
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (now, model, prompt_tokens, response_tokens, latency_ms, outcome))
+            conn.commit()
+
+    def get_gemini_call_counts(self, since: datetime) -> Dict[str, int]:
+        """
+        Count Gemini API attempts per outcome since a point in time.
+
+        Args:
+            since: Start of the period (timezone-aware)
 
+        Returns:
+            Dictionary mapping outcome to number of attempts
+        """
+        since_utc = since.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT outcome, COUNT(*) as count
+                FROM gemini_call_log
+                WHERE called_at >= ?
+                GROUP BY outcome
+            """, (since_utc,))
+
+            return {row["outcome"]: row["count"] for row in cursor.fetchall()}
+
+    def get_cached_response(self, cache_key: str) -> Optional[str]:
+        """
+        Get a cached Gemini response and mark it as recently used.
+
+        Args:
+            cache_key: Hash identifying the request
+
+        Returns:
+            Cached response text, or None if not cached
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT response FROM gemini_cache WHERE cache_key = ?
+            """, (cache_key,))
             row = cursor.fetchone()
-            count = row["count"] if row else 0
+            if not row:
+                return None
+
+            cursor.execute("""
+                UPDATE gemini_cache SET last_used_at = ? WHERE cache_key = ?
+            """, (datetime.now().isoformat(), cache_key))
+            conn.commit()
+            return row["response"]
+
+    def save_cached_response(self, cache_key: str, model: str, response: str) -> None:
+        """
+        Store (or replace) a Gemini response.
+
+        Args:
+            cache_key: Hash identifying the request
+            model: Model that generated the response
+            response: Response text
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO gemini_cache (
+                    cache_key,
+                    model,
+                    response,
+                    size_bytes,
+                    created_at,
+                    last_used_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (cache_key, model, response, len(response.encode("utf-8")), now, now))
+            conn.commit()
+
+    def evict_cached_responses(self, max_age_hours: int, max_bytes: int) -> int:
+        """
+        Remove expired responses, then the least recently used ones until the
+        cache fits max_bytes.
+
+        Args:
+            max_age_hours: Maximum age of a cached response in hours
+            max_bytes: Maximum total size of cached responses
+
+        Returns:
+            Number of responses removed
+        """
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM gemini_cache WHERE created_at < ?", (cutoff,))
+            removed = cursor.rowcount
+
+            cursor.execute("""
+                SELECT cache_key, size_bytes
+                FROM gemini_cache
+                ORDER BY last_used_at DESC
+            """)
+            total = 0
+            overflow = []
+            for row in cursor.fetchall():
+                total += row["size_bytes"]
+                if total > max_bytes:
+                    overflow.append((row["cache_key"],))
+
+            cursor.executemany("DELETE FROM gemini_cache WHERE cache_key = ?", overflow)
+            conn.commit()
+
+            removed += len(overflow)
+            if removed:
+                logger.debug(f"Evicted {removed} cached Gemini response(s)")
+            return removed
+
+    def get_cached_peer(self, chat_id: str) -> Optional[Dict]:
+        """
+        Get the cached input peer for a chat.
+
+        Args:
+            chat_id: Telegram chat ID
+
+        Returns:
+            Dictionary with peer_type, peer_id, access_hash and chat_name,
+            or None if not cached
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT peer_type, peer_id, access_hash, chat_name
+                FROM entity_cache
+                WHERE chat_id = ?
+            """, (chat_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def save_cached_peer(
+        self,
+        chat_id: str,
+        peer_type: str,
+        peer_id: int,
+        access_hash: Optional[int],
+        chat_name: str
+    ) -> None:
+        """
+        Store (or replace) the cached input peer for a chat.
+
+        Args:
+            chat_id: Telegram chat ID
+            peer_type: Peer type (channel, user or chat)
+            peer_id: Telegram peer ID
+            access_hash: Access hash for channels/users (None for basic chats)
+            chat_name: Display name of the chat
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO entity_cache (
+                    chat_id,
+                    peer_type,
+                    peer_id,
+                    access_hash,
+                    chat_name,
+                    updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (chat_id, peer_type, peer_id, access_hash, chat_name, now))
+            conn.commit()
+            logger.debug(f"Cached peer for {chat_id}: {peer_type} {peer_id}")
+
+    def delete_cached_peer(self, chat_id: str) -> None:
+        """
+        Remove the cached input peer for a chat.
 
-            logger.debug(f"Gemini API calls today: {count}")
-            return count
+        Args:
+            chat_id: Telegram chat ID
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM entity_cache WHERE chat_id = ?", (chat_id,))
+            conn.commit()
+
+    def get_cached_senders(self, user_ids: List[int], max_age_hours: int = 24) -> Dict[int, str]:
+        """
+        Get cached sender names that are newer than max_age_hours.
+
+        Args:
+            user_ids: Telegram user IDs to look up
+            max_age_hours: Maximum age of a cached name in hours
+
+        Returns:
+            Dictionary mapping user ID to sender name (missing or stale IDs omitted)
+        """
+        if not user_ids:
+            return {}
+
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        placeholders = ", ".join("?" for _ in user_ids)
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT user_id, sender_name
+                FROM sender_cache
+                WHERE user_id IN ({placeholders})
+                AND updated_at >= ?
+            """, (*user_ids, cutoff))
+
+            return {row["user_id"]: row["sender_name"] for row in cursor.fetchall()}
+
+    def save_cached_senders(self, names: Dict[int, str]) -> None:
+        """
+        Store (or replace) sender names.
+
+        Args:
+            names: Dictionary mapping user ID to sender name
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO sender_cache (user_id, sender_name, updated_at)
+                VALUES (?, ?, ?)
+            """, [(user_id, name, now) for user_id, name in names.items()])
+            conn.commit()
+            logger.debug(f"Cached {len(names)} sender name(s)")
+
+    def add_buffered_messages(self, chat_id: str, messages: List[Dict]) -> int:
+        """
+        Append messages to the durable listener buffer.
+
+        Messages already in the buffer are ignored, so overlapping catch-up
+        fetches and live updates are safe.
+
+        Args:
+            chat_id: Configured chat ID the messages belong to
+            messages: Message dictionaries (MessageRecord.to_dict() format)
+
+        Returns:
+            Number of messages newly added
+        """
+        if not messages:
+            return 0
+
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            before = conn.total_changes
+            cursor.executemany("""
+                INSERT OR IGNORE INTO message_buffer (
+                    chat_id,
+                    message_id,
+                    peer_id,
+                    chat_name,
+                    sender,
+                    text,
+                    timestamp,
+                    received_at,
+                    replies
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    chat_id, m["message_id"], m["chat_id"], m["chat_name"],
+                    m["sender"], m["text"], m["timestamp"], now, m.get("replies", 0)
+                )
+                for m in messages
+            ])
+            added = conn.total_changes - before
+            conn.commit()
+
+            logger.debug(f"Buffered {added} message(s) for {chat_id}")
+            return added
+
+    def get_buffered_messages(self, chat_id: str) -> List[Dict]:
+        """
+        Get all buffered messages for a chat in message ID order.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            List of message dictionaries with message_id, chat_id, chat_name,
+            sender, text, timestamp and replies (MessageRecord arguments)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT message_id, peer_id AS chat_id, chat_name, sender, text, timestamp, replies
+                FROM message_buffer
+                WHERE chat_id = ?
+                ORDER BY message_id
+            """, (chat_id,))
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_buffer_high_water(self, chat_id: str) -> Optional[int]:
+        """
+        Get the highest buffered message ID for a chat.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            Highest message ID in the buffer, or None if the chat has none
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT MAX(message_id) AS high_water FROM message_buffer WHERE chat_id = ?",
+                (chat_id,)
+            )
+            row = cursor.fetchone()
+            return row["high_water"] if row else None
+
+    def delete_buffered_messages(self, chat_id: str, up_to_message_id: int) -> int:
+        """
+        Remove consumed messages from the buffer.
+
+        Args:
+            chat_id: Configured chat ID
+            up_to_message_id: Highest message ID that was consumed
+
+        Returns:
+            Number of messages removed
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM message_buffer WHERE chat_id = ? AND message_id <= ?",
+                (chat_id, up_to_message_id)
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def get_backfill_checkpoint(self, chat_id: str) -> Optional[int]:
+        """
+        Get the backfill high-water message ID for a chat.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            Last checkpointed message ID, or None if never backfilled
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT high_water_message_id FROM backfill_checkpoint WHERE chat_id = ?",
+                (chat_id,)
+            )
+            row = cursor.fetchone()
+            return row["high_water_message_id"] if row else None
+
+    def update_backfill_checkpoint(
+        self,
+        chat_id: str,
+        high_water_message_id: int,
+        messages_buffered: int,
+        completed: bool = False
+    ) -> None:
+        """
+        Record backfill progress for a chat.
+
+        Args:
+            chat_id: Configured chat ID
+            high_water_message_id: Highest message ID paged through so far
+            messages_buffered: Messages buffered since the previous checkpoint
+            completed: Whether the backfill reached the end of history
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO backfill_checkpoint (
+                    chat_id,
+                    high_water_message_id,
+                    messages_buffered,
+                    completed,
+                    created_at,
+                    updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chat_id) DO UPDATE SET
+                    high_water_message_id = excluded.high_water_message_id,
+                    messages_buffered = messages_buffered + excluded.messages_buffered,
+                    completed = excluded.completed,
+                    updated_at = excluded.updated_at
+            """, (chat_id, high_water_message_id, messages_buffered, int(completed), now, now))
+            conn.commit()
+
+    def get_catchup_gap(self, chat_id: str) -> Optional[int]:
+        """
+        Get the point an unfinished listener catch-up must resume from.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            Last message ID caught up to, or None if there is no open gap
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT resume_message_id FROM catchup_gap WHERE chat_id = ?",
+                (chat_id,)
+            )
+            row = cursor.fetchone()
+            return row["resume_message_id"] if row else None
+
+    def update_catchup_gap(self, chat_id: str, resume_message_id: Optional[int]) -> None:
+        """
+        Record or clear an unfinished listener catch-up.
+
+        Args:
+            chat_id: Configured chat ID
+            resume_message_id: Last message ID caught up to (None = gap closed)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if resume_message_id is None:
+                cursor.execute("DELETE FROM catchup_gap WHERE chat_id = ?", (chat_id,))
+            else:
+                cursor.execute("""
+                    INSERT INTO catchup_gap (chat_id, resume_message_id, updated_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(chat_id) DO UPDATE SET
+                        resume_message_id = excluded.resume_message_id,
+                        updated_at = excluded.updated_at
+                """, (chat_id, resume_message_id, datetime.now().isoformat()))
+            conn.commit()
+
+    def update_account_state(
+        self,
+        account: str,
+        chats_assigned: int,
+        messages_fetched: int,
+        flood_waits: int,
+        connect_latency_ms: Optional[int] = None
+    ) -> None:
+        """
+        Record the latest run statistics for a Telegram account.
+
+        Args:
+            account: Account name
+            chats_assigned: Number of chats assigned to the account
+            messages_fetched: Messages fetched by the account in this run
+            flood_waits: Flood waits hit by the account in this run
+            connect_latency_ms: Connection latency in milliseconds (optional)
+        """
+        now = datetime.now().isoformat()
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO account_state (
+                    account,
+                    chats_assigned,
+                    messages_fetched,
+                    flood_waits,
+                    connect_latency_ms,
+                    last_run_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (account, chats_assigned, messages_fetched, flood_waits, connect_latency_ms, now))
+            conn.commit()
+
+    def get_account_states(self) -> List[Dict]:
+        """
+        Get the latest run statistics for every account.
+
+        Returns:
+            List of account state dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM account_state ORDER BY account")
+            return [dict(row) for row in cursor.fetchall()]
 
     def close(self) -> None:
         """Close database connection (currently no-op as we use context managers)."""
@@ -0,0 +1,86 @@
+"""Assignment of chats to Telegram accounts for sharded ingestion."""
+
+import zlib
+from typing import Dict, List
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Supported load-balancing policies for chats without an explicit account
+ACCOUNT_POLICIES = ("hash", "round_robin")
+
+
+def assign_chats(
+    chat_configs: List[Dict],
+    account_names: List[str],
+    policy: str = "hash"
+) -> Dict[str, List[Dict]]:
+    """
+    Assign each chat to an account.
+
+    A chat's "account" key wins if it names a configured account. Other
+    chats are spread by the policy: "hash" keeps a chat on the same account
+    as long as the account list is unchanged (peer access hashes are
+    per-account, so stable placement avoids re-resolving), "round_robin"
+    deals chats out in configuration order.
+
+    Args:
+        chat_configs: Chat configuration dictionaries
+        account_names: Configured account names, in order
+        policy: Load-balancing policy for unassigned chats
+
+    Returns:
+        Dictionary mapping account name to its chat configurations
+        (every account is present, possibly with an empty list)
+
+    Raises:
+        ValueError: If no accounts are given or the policy is unknown
+    """
+    if not account_names:
+        raise ValueError("At least one Telegram account is required")
+    if policy not in ACCOUNT_POLICIES:
+        raise ValueError(
+            f"Unknown account_policy '{policy}' (expected one of: {', '.join(ACCOUNT_POLICIES)})"
+        )
+
+    assignments: Dict[str, List[Dict]] = {name: [] for name in account_names}
+    next_index = 0
+
+    for chat_config in chat_configs:
+        account = chat_config.get("account")
+
+        if account is not None and account not in assignments:
+            logger.warning(
+                f"Chat {chat_config.get('name')} names unknown account '{account}' - "
+                f"assigning by {policy} policy"
+            )
+            account = None
+
+        if account is None:
+            if policy == "hash":
+                chat_id = str(chat_config.get("chat_id"))
+                account = account_names[zlib.crc32(chat_id.encode("utf-8")) % len(account_names)]
+            else:
+                account = account_names[next_index % len(account_names)]
+                next_index += 1
+
+        assignments[account].append(chat_config)
+
+    return assignments
+
+
+def peer_namespace(account: Dict) -> str:
+    """
+    Get the entity cache namespace for an account.
+
+    The account using the plain TELEGRAM_* variables keeps the un-prefixed
+    keys, so caches written before multi-account support stay valid.
+
+    Args:
+        account: Account dictionary from Settings.telegram_accounts
+
+    Returns:
+        Namespace string ("" for the default account)
+    """
+    return "" if account["env_prefix"] == "TELEGRAM_" else account["name"]
@@ -0,0 +1,146 @@
+"""Resumable history backfill with mid-chat checkpoints."""
+
+import asyncio
+from typing import Optional
+
+from src.storage.state_manager import StateManager
+from src.telegram_client.entity_cache import EntityCache
+from src.telegram_client.message_fetcher import (
+    DEFAULT_INITIAL_WINDOW,
+    MessageFetcher,
+    parse_fetch_window,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Backfiller:
+    """
+    Pages through a chat's history oldest-first into the message buffer.
+
+    The high-water mark is checkpointed in StateManager every
+    checkpoint_every messages, so an interrupted backfill resumes exactly
+    where it stopped. The buffered messages are then consumed by the normal
+    digest run (see --from-buffer).
+    """
+
+    def __init__(
+        self,
+        fetcher: MessageFetcher,
+        entity_cache: EntityCache,
+        state_manager: StateManager,
+        chunk_size: int = 100,
+        checkpoint_every: int = 500,
+        pacing_seconds: float = 1.0,
+        initial_window: str = DEFAULT_INITIAL_WINDOW
+    ):
+        """
+        Initialize Backfiller.
+
+        Args:
+            fetcher: Message fetcher used to extract records (and its client)
+            entity_cache: Shared entity cache
+            state_manager: State manager holding checkpoints and the buffer
+            chunk_size: Messages requested per history call
+            checkpoint_every: Messages between checkpoints
+            pacing_seconds: Pause between history calls
+            initial_window: Start of history for chats with no state at all
+        """
+        self.fetcher = fetcher
+        self.client = fetcher.client
+        self.entity_cache = entity_cache
+        self.state_manager = state_manager
+        self.chunk_size = chunk_size
+        self.checkpoint_every = checkpoint_every
+        self.pacing_seconds = pacing_seconds
+        self.initial_window = initial_window
+
+    def _resume_point(self, chat_id: str) -> Optional[int]:
+        """
+        Highest message ID already backfilled or processed.
+
+        The buffer high-water mark is deliberately ignored: the --listen
+        buffer holds the newest messages, so after an outage it would skip
+        the very gap the backfill has to fill. Overlap with the listener's
+        messages is harmless because buffering ignores known message IDs.
+        """
+        candidates = [
+            self.state_manager.get_backfill_checkpoint(chat_id),
+            self.state_manager.get_last_message_id(chat_id),
+        ]
+        known = [c for c in candidates if c]
+        return max(known) if known else None
+
+    async def backfill_chat(self, chat_id: str) -> int:
+        """
+        Backfill one chat into the message buffer.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            Number of messages buffered in this run
+        """
+        chat_id = str(chat_id)
+        peer, chat_name = await self.entity_cache.resolve(chat_id)
+        high_water = self._resume_point(chat_id)
+
+        if high_water:
+            logger.info(f"Backfilling {chat_name} from message ID {high_water}")
+        else:
+            logger.info(f"Backfilling {chat_name} from window {self.initial_window}")
+
+        total = 0
+        since_checkpoint = 0
+        pending = []
+
+        while True:
+            if high_water:
+                history = self.client.iter_messages(
+                    peer,
+                    offset_id=high_water,
+                    reverse=True,
+                    limit=self.chunk_size
+                )
+            else:
+                history = self.client.iter_messages(
+                    peer,
+                    offset_date=parse_fetch_window(self.initial_window),
+                    reverse=True,
+                    limit=self.chunk_size
+                )
+
+            page = [message async for message in history]
+            if not page:
+                break
+
+            high_water = max(message.id for message in page)
+            text_messages = [message for message in page if message.message]
+            pending.extend(await self.fetcher.extract_records(text_messages, chat_name))
+            since_checkpoint += len(page)
+
+            if since_checkpoint >= self.checkpoint_every:
+                total += self._checkpoint(chat_id, high_water, pending)
+                pending = []
+                since_checkpoint = 0
+
+            if len(page) < self.chunk_size:
+                break
+
+            await asyncio.sleep(self.pacing_seconds)
+
+        if high_water:
+            total += self._checkpoint(chat_id, high_water, pending, completed=True)
+
+        logger.info(f"Backfill complete for {chat_name}: {total} message(s) buffered")
+        return total
+
+    def _checkpoint(self, chat_id: str, high_water: int, records: list, completed: bool = False) -> int:
+        """Buffer pending records, then record the high-water mark."""
+        added = self.state_manager.add_buffered_messages(
+            chat_id, [record.to_dict() for record in records]
+        )
+        self.state_manager.update_backfill_checkpoint(chat_id, high_water, added, completed)
+        logger.debug(f"Backfill checkpoint for {chat_id} at message ID {high_water}")
+        return added
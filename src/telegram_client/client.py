@@ -1,16 +1,137 @@
 """Telegram client module for connecting to Telegram API."""
 
+import json
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from telethon import TelegramClient as TelethonClient
-from telethon.sessions import StringSession
+from telethon import utils
+from telethon.sessions import SQLiteSession, StringSession
+from telethon.tl.tlobject import TLObject
+from telethon.tl.types import (
+    InputPeerChannel,
+    InputPeerChat,
+    InputPeerUser,
+    PeerChannel,
+    PeerChat,
+    PeerUser,
+)
 
+from src.telegram_client.rate_limiter import RateLimitedClient
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _entities_of(tlo) -> List:
+    """Get the users and chats contained in an API result (or a list of them)."""
+    if not isinstance(tlo, TLObject) and utils.is_list_like(tlo):
+        return list(tlo)
+
+    entities = []
+    for attr in ("user", "chat"):
+        if hasattr(tlo, attr):
+            entities.append(getattr(tlo, attr))
+    for attr in ("chats", "users"):
+        if utils.is_list_like(getattr(tlo, attr, None)):
+            entities.extend(getattr(tlo, attr))
+    return entities
+
+
+class SnapshotSession(StringSession):
+    """
+    StringSession that also remembers the input peers it has seen.
+
+    StringSession serializes only the auth key and data center, so peers
+    learned in one run would be unknown in the next and numeric chat IDs
+    could not be resolved. This session records the access hash of every
+    entity in API results, keyed by marked peer ID, and answers lookups the
+    in-memory session cannot from those records, then from the file session
+    created by setup_telegram.py. Only the public Session interface is used.
+    """
+
+    def __init__(self, string: str, peers: Dict[str, int], file_session_path: Optional[str] = None):
+        """
+        Initialize SnapshotSession.
+
+        Args:
+            string: StringSession string
+            peers: Access hash per marked peer ID from previous runs (updated in place)
+            file_session_path: File session consulted on a miss (None = none)
+        """
+        super().__init__(string)
+        self.peers = peers
+        self.file_session_path = file_session_path
+
+    def process_entities(self, tlo) -> None:
+        super().process_entities(tlo)
+
+        for entity in _entities_of(tlo):
+            # Min entities carry no usable access hash
+            if getattr(entity, "min", False):
+                continue
+            try:
+                peer = utils.get_input_peer(entity, allow_self=False)
+            except TypeError:
+                continue
+            self._remember(peer)
+
+    def get_input_entity(self, key):
+        try:
+            return super().get_input_entity(key)
+        except ValueError:
+            peer = self._saved_peer(key)
+            if peer is None:
+                raise
+            return peer
+
+    def _remember(self, peer) -> None:
+        """Record an input peer's access hash."""
+        if isinstance(peer, (InputPeerUser, InputPeerChat, InputPeerChannel)):
+            self.peers[str(utils.get_peer_id(peer))] = getattr(peer, "access_hash", 0)
+
+    def _saved_peer(self, key):
+        """Look up a peer ID or Peer in the saved peers, then in the file session."""
+        if isinstance(key, TLObject):
+            try:
+                candidates = [utils.get_peer_id(key)]
+            except TypeError:
+                return None
+        elif isinstance(key, int):
+            # Bare positive IDs may be a user, a chat or a channel
+            candidates = [key] if key < 0 else [
+                key, utils.get_peer_id(PeerChat(key)), utils.get_peer_id(PeerChannel(key))
+            ]
+        else:
+            return None
+
+        for marked_id in candidates:
+            if str(marked_id) in self.peers:
+                entity_id, kind = utils.resolve_id(marked_id)
+                access_hash = self.peers[str(marked_id)]
+                if kind is PeerUser:
+                    return InputPeerUser(entity_id, access_hash)
+                if kind is PeerChat:
+                    return InputPeerChat(entity_id)
+                return InputPeerChannel(entity_id, access_hash)
+
+        if self.file_session_path is None:
+            return None
+
+        file_session = SQLiteSession(self.file_session_path)
+        try:
+            peer = file_session.get_input_entity(key)
+        except ValueError:
+            return None
+        finally:
+            file_session.close()
+
+        self._remember(peer)
+        return peer
+
+
 class TelegramClient:
     """Wrapper for Telegram API client with session management."""
 
@@ -19,7 +140,9 @@ class TelegramClient:
         api_id: str,
         api_hash: str,
         phone_number: str,
-        session_name: str = "telegram_session"
+        session_name: str = "telegram_session",
+        max_concurrency: int = 5,
+        session_mode: str = "file"
     ):
         """
         Initialize Telegram client.
@@ -29,6 +152,11 @@ class TelegramClient:
             api_hash: Telegram API hash
             phone_number: Phone number for authentication
             session_name: Name of session file (default: telegram_session)
+            max_concurrency: Maximum number of rate-limited API calls in flight
+            session_mode: "file" for the SQLite session file, or "memory" for an
+                in-memory StringSession loaded from (and saved back to) a snapshot;
+                the peer access hashes it learns are kept in a JSON file next to
+                the snapshot (see SnapshotSession)
         """
         self.api_id = api_id
         self.api_hash = api_hash
@@ -40,14 +168,31 @@ class TelegramClient:
         session_dir.mkdir(parents=True, exist_ok=True)
 
         self.session_path = str(session_dir / session_name)
+        self.snapshot_path = session_dir / f"{session_name}.string"
+        self.entities_path = session_dir / f"{session_name}.entities.json"
+        self.session_mode = session_mode
+        self.connect_latency_ms: Optional[int] = None
+
+        if session_mode == "memory":
+            # No session file I/O or locking: state lives in memory until shutdown
+            self._snapshot = self._load_snapshot()
+            self._peers = self._load_peers()
+
+            file_session = self.session_path if Path(self.session_path + ".session").exists() else None
+            session = SnapshotSession(self._snapshot, dict(self._peers), file_session)
+        else:
+            session = self.session_path
 
         # Initialize Telethon client
         self.client = TelethonClient(
-            self.session_path,
+            session,
             self.api_id,
             self.api_hash
         )
 
+        # Rate-limited view of the client used for all fetching
+        self.api = RateLimitedClient(self.client, max_concurrency=max_concurrency)
+
         self._connected = False
         logger.info(f"TelegramClient initialized with session: {session_name}")
 
@@ -59,6 +204,7 @@ class TelegramClient:
             ConnectionError: If connection fails
         """
         try:
+            start = time.monotonic()
             await self.client.connect()
 
             # Check if already authorized
@@ -69,7 +215,11 @@ class TelegramClient:
                 )
 
             self._connected = True
-            logger.info("Successfully connected to Telegram")
+            self.connect_latency_ms = int((time.monotonic() - start) * 1000)
+            logger.info(
+                f"Successfully connected to Telegram in {self.connect_latency_ms}ms "
+                f"(session: {self.session_mode})"
+            )
 
         except Exception as e:
             logger.error(f"Failed to connect to Telegram: {e}")
@@ -78,10 +228,72 @@ class TelegramClient:
     async def disconnect(self) -> None:
         """Disconnect from Telegram API."""
         if self._connected:
+            if self.session_mode == "memory":
+                self._save_snapshot()
             await self.client.disconnect()
             self._connected = False
             logger.info("Disconnected from Telegram")
 
+    def _load_snapshot(self) -> str:
+        """
+        Load the serialized session snapshot for in-memory mode.
+
+        If no snapshot exists yet, the auth state is copied once from the
+        file session created by setup_telegram.py.
+
+        Returns:
+            StringSession string ("" if no session is available)
+        """
+        if self.snapshot_path.exists():
+            return self.snapshot_path.read_text(encoding="utf-8").strip()
+
+        if Path(self.session_path + ".session").exists():
+            file_session = SQLiteSession(self.session_path)
+            try:
+                snapshot = StringSession.save(file_session)
+            finally:
+                file_session.close()
+            logger.info("Created in-memory session snapshot from session file")
+            return snapshot
+
+        return ""
+
+    def _load_peers(self) -> Dict[str, int]:
+        """
+        Load the peer access hashes saved by previous in-memory runs.
+
+        Returns:
+            Access hash per marked peer ID (empty if none were saved)
+        """
+        if not self.entities_path.exists():
+            return {}
+        return json.loads(self.entities_path.read_text(encoding="utf-8"))
+
+    def _save_snapshot(self) -> None:
+        """Write the session snapshot and saved peers back if they changed."""
+        snapshot = StringSession.save(self.client.session)
+
+        if snapshot == self._snapshot:
+            logger.debug("Session snapshot unchanged")
+        else:
+            self._write_private(self.snapshot_path, snapshot)
+            self._snapshot = snapshot
+            logger.info("Saved updated session snapshot")
+
+        peers = self.client.session.peers
+        if peers != self._peers:
+            self._write_private(self.entities_path, json.dumps(peers, sort_keys=True))
+            self._peers = dict(peers)
+            logger.info(f"Saved {len(peers)} session peer(s)")
+
+    @staticmethod
+    def _write_private(path: Path, content: str) -> None:
+        """Atomically write a file readable only by the owner."""
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+
     def is_connected(self) -> bool:
         """Check if client is connected."""
         return self._connected
@@ -0,0 +1,74 @@
+"""Dialog probe module for detecting idle chats with one bulk request."""
+
+from typing import Dict, List
+
+from telethon import TelegramClient, utils
+from telethon.tl.functions.messages import GetPeerDialogsRequest
+from telethon.tl.types import InputDialogPeer
+
+from src.telegram_client.entity_cache import EntityCache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Maximum number of peers sent in a single GetPeerDialogsRequest
+PROBE_BATCH_SIZE = 100
+
+
+class DialogProbe:
+    """Fetches the top message ID of many chats at once."""
+
+    def __init__(self, telegram_client: TelegramClient, entity_cache: EntityCache):
+        """
+        Initialize DialogProbe.
+
+        Args:
+            telegram_client: Connected Telethon TelegramClient instance
+            entity_cache: Shared entity cache used to resolve chat IDs
+        """
+        self.client = telegram_client
+        self.entity_cache = entity_cache
+
+    async def probe(self, chat_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get dialog status for the given chats.
+
+        Chats that cannot be resolved are left out of the result, so the
+        caller falls back to a normal fetch for them.
+
+        Args:
+            chat_ids: Chat identifiers to probe
+
+        Returns:
+            Dictionary mapping chat_id to {"top_message": int}
+        """
+        peers_by_id: Dict[int, str] = {}
+        input_peers = []
+
+        for chat_id in chat_ids:
+            try:
+                peer, _ = await self.entity_cache.resolve(chat_id)
+            except Exception as e:
+                logger.debug(f"Skipping probe for {chat_id}: {e}")
+                continue
+
+            peers_by_id[utils.get_peer_id(peer)] = chat_id
+            input_peers.append(peer)
+
+        status: Dict[str, Dict] = {}
+
+        for start in range(0, len(input_peers), PROBE_BATCH_SIZE):
+            batch = input_peers[start:start + PROBE_BATCH_SIZE]
+            result = await self.client(GetPeerDialogsRequest(
+                peers=[InputDialogPeer(peer) for peer in batch]
+            ))
+
+            for dialog in result.dialogs:
+                chat_id = peers_by_id.get(utils.get_peer_id(dialog.peer))
+                if chat_id is None:
+                    continue
+
+                status[chat_id] = {"top_message": dialog.top_message}
+
+        logger.info(f"Probed {len(status)}/{len(chat_ids)} chat(s) in bulk")
+        return status
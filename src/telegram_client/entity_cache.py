@@ -0,0 +1,187 @@
+"""Entity resolution cache for avoiding repeated get_entity() lookups."""
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+from telethon import TelegramClient, utils
+from telethon.errors import (
+    ChannelInvalidError,
+    ChatIdInvalidError,
+    PeerIdInvalidError,
+)
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+
+from src.storage.state_manager import StateManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Errors Telegram returns when a stored peer (or its access hash) is stale
+INVALID_PEER_ERRORS = (PeerIdInvalidError, ChannelInvalidError, ChatIdInvalidError)
+
+
+def to_entity_id(chat_id: str):
+    """
+    Convert a configured chat_id to the form get_entity() expects.
+
+    Args:
+        chat_id: Chat identifier from configuration
+
+    Returns:
+        Integer ID for numeric chat IDs, otherwise the original string
+    """
+    chat_id = str(chat_id)
+    return int(chat_id) if chat_id.lstrip('-').isdigit() else chat_id
+
+
+class EntityCache:
+    """
+    Resolves chat IDs to input peers through an in-process LRU backed by SQLite.
+
+    Warm lookups cost no RPCs. A peer is only re-resolved via get_entity()
+    when it is missing from both cache levels or Telegram reports it invalid.
+    """
+
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        state_manager: Optional[StateManager] = None,
+        max_size: int = 256,
+        namespace: str = ""
+    ):
+        """
+        Initialize EntityCache.
+
+        Args:
+            telegram_client: Connected Telethon TelegramClient instance
+            state_manager: State manager for persistent caching (None = memory only)
+            max_size: Maximum number of peers kept in the in-process LRU
+            namespace: Account name prefixed to persisted keys, since access
+                hashes are only valid for the account that resolved them
+        """
+        self.client = telegram_client
+        self.state_manager = state_manager
+        self.max_size = max_size
+        self.namespace = namespace
+        self._lru: "OrderedDict[str, Tuple[object, str]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, chat_id: str) -> Tuple[object, str]:
+        """
+        Resolve a chat ID to an input peer and display name.
+
+        Args:
+            chat_id: Chat identifier (username, phone number, or ID)
+
+        Returns:
+            Tuple of (input peer, chat name)
+        """
+        key = str(chat_id)
+
+        # Level 1: in-process LRU
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return self._lru[key]
+
+        # Level 2: SQLite
+        if self.state_manager is not None:
+            row = self.state_manager.get_cached_peer(self._storage_key(key))
+            if row:
+                peer = self._build_input_peer(row)
+                if peer is not None:
+                    self.hits += 1
+                    self._remember(key, peer, row["chat_name"])
+                    return peer, row["chat_name"]
+
+        # Miss: one get_entity() round trip
+        self.misses += 1
+        entity = await self.client.get_entity(to_entity_id(key))
+        chat_name = getattr(entity, "title", None) or getattr(entity, "username", None) or key
+        peer = utils.get_input_peer(entity)
+
+        self._remember(key, peer, chat_name)
+        if self.state_manager is not None:
+            peer_type, peer_id, access_hash = self._describe_input_peer(peer)
+            if peer_type != "other":
+                self.state_manager.save_cached_peer(
+                    self._storage_key(key), peer_type, peer_id, access_hash, chat_name
+                )
+
+        logger.debug(f"Resolved entity for {key}: {chat_name}")
+        return peer, chat_name
+
+    def invalidate(self, chat_id: str) -> None:
+        """
+        Drop a chat's cached peer from both cache levels.
+
+        Args:
+            chat_id: Chat identifier
+        """
+        key = str(chat_id)
+        self._lru.pop(key, None)
+        if self.state_manager is not None:
+            self.state_manager.delete_cached_peer(self._storage_key(key))
+        logger.info(f"Invalidated cached peer for {key}")
+
+    async def with_peer(
+        self,
+        chat_id: str,
+        operation: Callable[[object, str], Awaitable[T]]
+    ) -> T:
+        """
+        Run an operation against a chat's peer, refreshing it once if stale.
+
+        Args:
+            chat_id: Chat identifier
+            operation: Async callable receiving (input peer, chat name)
+
+        Returns:
+            Result of the operation
+        """
+        peer, chat_name = await self.resolve(chat_id)
+        try:
+            return await operation(peer, chat_name)
+        except INVALID_PEER_ERRORS as e:
+            logger.warning(f"Cached peer for {chat_id} rejected by Telegram ({e}) - refreshing")
+            self.invalidate(chat_id)
+            peer, chat_name = await self.resolve(chat_id)
+            return await operation(peer, chat_name)
+
+    def _storage_key(self, key: str) -> str:
+        """Key under which a chat's peer is persisted for this account."""
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _remember(self, key: str, peer: object, chat_name: str) -> None:
+        """Insert a peer into the LRU, evicting the oldest entry if full."""
+        self._lru[key] = (peer, chat_name)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    @staticmethod
+    def _describe_input_peer(peer: object) -> Tuple[str, int, Optional[int]]:
+        """Split an input peer into (type, id, access_hash) for storage."""
+        if isinstance(peer, InputPeerChannel):
+            return "channel", peer.channel_id, peer.access_hash
+        if isinstance(peer, InputPeerUser):
+            return "user", peer.user_id, peer.access_hash
+        if isinstance(peer, InputPeerChat):
+            return "chat", peer.chat_id, None
+        return "other", 0, None
+
+    @staticmethod
+    def _build_input_peer(row: dict) -> Optional[object]:
+        """Rebuild an input peer from a stored cache row."""
+        peer_type = row["peer_type"]
+        if peer_type == "channel":
+            return InputPeerChannel(channel_id=row["peer_id"], access_hash=row["access_hash"])
+        if peer_type == "user":
+            return InputPeerUser(user_id=row["peer_id"], access_hash=row["access_hash"])
+        if peer_type == "chat":
+            return InputPeerChat(chat_id=row["peer_id"])
+        return None
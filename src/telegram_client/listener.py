@@ -0,0 +1,167 @@
+"""Real-time listener that buffers new messages for the daily digest."""
+
+from typing import Dict, List, Optional, Tuple
+
+from telethon import events, utils
+
+from src.storage.state_manager import StateManager
+from src.telegram_client.client import TelegramClient
+from src.telegram_client.entity_cache import EntityCache
+from src.telegram_client.message_fetcher import MessageFetcher
+from src.telegram_client.sender_cache import SenderCache
+from src.utils.error_handler import ErrorContext
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MessageListener:
+    """
+    Subscribes to new-message updates for the enabled chats and stores them
+    in the StateManager message buffer as they arrive.
+
+    On start, each chat is caught up with a bounded history fetch from its
+    buffer high-water mark (or last processed message), which fills any gap
+    left while the listener was down. The update handler is registered
+    before the catch-up, so messages arriving meanwhile are not missed;
+    messages seen by both are buffered only once.
+
+    Catch-up reads oldest first. Until it has reached the newest message,
+    the point it got to is kept in the state DB, and the next start resumes
+    from there even though live messages have raised the buffer high-water
+    mark past the gap.
+    """
+
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        state_manager: StateManager,
+        chat_configs: List[Dict],
+        catchup_limit: int = 1000,
+        account: str = ""
+    ):
+        """
+        Initialize MessageListener.
+
+        Args:
+            telegram_client: Telegram client wrapper (connected before run())
+            state_manager: State manager holding the message buffer
+            chat_configs: Chat configuration dictionaries to listen to
+            catchup_limit: Maximum number of messages fetched per chat on start
+            account: Account name used to namespace cached peers ("" = default)
+        """
+        self.telegram_client = telegram_client
+        self.state_manager = state_manager
+        self.chat_configs = chat_configs
+        self.catchup_limit = catchup_limit
+
+        api = telegram_client.api
+        self.entity_cache = EntityCache(api, state_manager, namespace=account)
+        self.sender_cache = SenderCache(api, state_manager)
+        self.fetcher = MessageFetcher(api, self.entity_cache, sender_cache=self.sender_cache)
+
+        # Marked peer ID -> (configured chat_id, chat name)
+        self._chats: Dict[int, Tuple[str, str]] = {}
+
+    async def run(self) -> None:
+        """Subscribe to live updates, catch up every chat, then buffer until disconnected."""
+        peers = []
+
+        for chat_config in self.chat_configs:
+            chat_id = str(chat_config.get("chat_id"))
+            with ErrorContext(f"Resolving chat {chat_config.get('name')}", raise_on_error=False):
+                peer, chat_name = await self.entity_cache.resolve(chat_id)
+                self._chats[utils.get_peer_id(peer)] = (chat_id, chat_name)
+                peers.append(peer)
+
+        if not peers:
+            logger.error("No chats could be resolved - listener not started")
+            return
+
+        # Catch-up start points, taken before live messages raise the high-water marks
+        start_points = {
+            chat_id: self._catch_up_start(chat_id)
+            for chat_id, _ in self._chats.values()
+        }
+
+        client = self.telegram_client.client
+        client.add_event_handler(self._on_new_message, events.NewMessage(chats=peers))
+
+        for chat_id, chat_name in list(self._chats.values()):
+            with ErrorContext(f"Catching up {chat_name}", raise_on_error=False):
+                await self._catch_up(chat_id, start_points[chat_id])
+
+        logger.info(f"Listening for new messages in {len(peers)} chat(s)...")
+        await client.run_until_disconnected()
+
+    def _catch_up_start(self, chat_id: str) -> Optional[int]:
+        """
+        Get the message ID after which a chat must be caught up.
+
+        Args:
+            chat_id: Configured chat ID
+
+        Returns:
+            Resume point of an unfinished catch-up, otherwise the buffer
+            high-water mark, or the last processed message ID
+        """
+        last_processed = self.state_manager.get_last_message_id(chat_id)
+
+        gap = self.state_manager.get_catchup_gap(chat_id)
+        if gap is not None:
+            # Messages up to last_processed were consumed already
+            return max(gap, last_processed or 0)
+
+        return self.state_manager.get_buffer_high_water(chat_id) or last_processed
+
+    async def _catch_up(self, chat_id: str, high_water: Optional[int]) -> None:
+        """
+        Buffer messages missed while the listener was not running.
+
+        Messages are read oldest first, so stopping at catchup_limit leaves
+        the newer part of the gap, which is recorded and resumed on the next
+        start. The gap stays open if the catch-up fails.
+
+        Args:
+            chat_id: Configured chat ID
+            high_water: Message ID to catch up from (exclusive)
+        """
+        if high_water is not None:
+            self.state_manager.update_catchup_gap(chat_id, high_water)
+
+        records = []
+        complete = True
+        async for record in self.fetcher.stream_new_messages(chat_id, high_water, oldest_first=True):
+            records.append(record)
+            if len(records) >= self.catchup_limit:
+                complete = False
+                break
+
+        added = self.state_manager.add_buffered_messages(
+            chat_id, [record.to_dict() for record in records]
+        )
+
+        if complete:
+            self.state_manager.update_catchup_gap(chat_id, None)
+            logger.info(f"Catch-up buffered {added} message(s) for {chat_id}")
+        else:
+            resume = records[-1].message_id
+            self.state_manager.update_catchup_gap(chat_id, resume)
+            logger.warning(
+                f"Catch-up for {chat_id} stopped at {self.catchup_limit} messages "
+                f"(up to ID {resume}) - the rest is fetched on the next start"
+            )
+
+    async def _on_new_message(self, event) -> None:
+        """Store a live message in the buffer."""
+        chat = self._chats.get(event.chat_id)
+        if chat is None or not event.message.message:
+            return
+
+        chat_id, chat_name = chat
+        try:
+            records = await self.fetcher.extract_records([event.message], chat_name)
+            self.state_manager.add_buffered_messages(chat_id, [record.to_dict() for record in records])
+            logger.debug(f"Buffered message {event.message.id} from {chat_name}")
+        except Exception as e:
+            logger.error(f"Failed to buffer message from {chat_name}: {e}")
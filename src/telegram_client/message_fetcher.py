@@ -1,33 +1,92 @@
 """Message fetching module for retrieving new Telegram messages."""
 
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import AsyncIterator, List, Optional
 
 from telethon import TelegramClient
 from telethon.tl.types import Message
 
+from src.telegram_client.entity_cache import INVALID_PEER_ERRORS, EntityCache
+from src.telegram_client.message_record import MessageRecord
+from src.telegram_client.rate_limiter import HISTORY_PAGE_SIZE
+from src.telegram_client.sender_cache import SenderCache
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Default look-back window for a chat's first fetch
+DEFAULT_INITIAL_WINDOW = "24h"
+
+# Default number of messages per batch yielded by iter_message_batches
+DEFAULT_BATCH_SIZE = 200
+
+
+def parse_fetch_window(window: str, now: Optional[datetime] = None) -> datetime:
+    """
+    Convert an initial fetch window setting into a UTC cutoff time.
+
+    Args:
+        window: Relative window such as "24h" or "7d", or an explicit
+            ISO date/datetime such as "2024-01-31" (naive values are UTC)
+        now: Reference time (default: current UTC time)
+
+    Returns:
+        Timezone-aware cutoff datetime
+
+    Raises:
+        ValueError: If the window cannot be parsed
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    value = str(window).strip().lower()
+    units = {"h": "hours", "d": "days"}
+
+    if value[-1:] in units and value[:-1].isdigit():
+        return now - timedelta(**{units[value[-1]]: int(value[:-1])})
+
+    try:
+        since = datetime.fromisoformat(str(window).strip())
+    except ValueError:
+        raise ValueError(
+            f"Invalid initial fetch window '{window}' "
+            f"(expected e.g. '24h', '7d' or '2024-01-31')"
+        )
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since
+
 
 class MessageFetcher:
     """Handles fetching messages from Telegram chats."""
 
-    def __init__(self, telegram_client: TelegramClient):
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        entity_cache: Optional[EntityCache] = None,
+        initial_window: str = DEFAULT_INITIAL_WINDOW,
+        sender_cache: Optional[SenderCache] = None
+    ):
         """
         Initialize MessageFetcher.
 
         Args:
             telegram_client: Connected Telethon TelegramClient instance
+            entity_cache: Shared entity cache (default: private in-memory cache)
+            initial_window: Look-back window for first runs ("24h", "7d" or an ISO date)
+            sender_cache: Shared sender name cache (default: private in-memory cache)
         """
         self.client = telegram_client
+        self.entity_cache = entity_cache or EntityCache(telegram_client)
+        self.initial_window = initial_window
+        self.sender_cache = sender_cache or SenderCache(telegram_client)
 
     async def fetch_new_messages(
         self,
         chat_id: str,
         last_message_id: Optional[int] = None
-    ) -> List[Dict]:
+    ) -> List[MessageRecord]:
         """
         Fetch new messages from a chat since last_message_id.
 
@@ -36,61 +95,174 @@ class MessageFetcher:
             last_message_id: Last processed message ID (None for initial run)
 
         Returns:
-            List of message dictionaries with metadata
+            List of message records
 
         Initial execution behavior:
-            If last_message_id is None, fetches messages from the last 24 hours
+            If last_message_id is None, fetches messages newer than the
+            initial window (default: last 24 hours)
         """
-        try:
-            # Get chat entity
-            # Convert numeric chat_id to integer for group chats
-            entity_id = int(chat_id) if chat_id.lstrip('-').isdigit() else chat_id
-            chat = await self.client.get_entity(entity_id)
-            chat_name = getattr(chat, "title", None) or getattr(chat, "username", None) or str(chat_id)
+        messages = []
+        async for msg_data in self.stream_new_messages(chat_id, last_message_id):
+            messages.append(msg_data)
+        return messages
 
-            messages = []
+    async def stream_new_messages(
+        self,
+        chat_id: str,
+        last_message_id: Optional[int] = None,
+        oldest_first: bool = False
+    ) -> AsyncIterator[MessageRecord]:
+        """
+        Yield new messages from a chat one at a time as pages arrive.
+
+        Unlike fetch_new_messages, nothing is accumulated, so memory use does
+        not grow with the size of the backlog.
+
+        Args:
+            chat_id: Chat identifier (username, phone number, or ID)
+            last_message_id: Last processed message ID (None for initial run)
+            oldest_first: Read messages after last_message_id in ascending ID
+                order, so a consumer that stops early keeps a gap-free prefix
+                (the initial run always reads oldest first)
 
-            if last_message_id is None:
-                # Initial execution: fetch last 24 hours
-                logger.info(f"Initial fetch for {chat_name} - retrieving last 24 hours")
-                cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
+        Yields:
+            Message records
+        """
+        chat, chat_name = await self.entity_cache.resolve(chat_id)
+        yielded = False
+
+        try:
+            try:
+                async for msg_data in self._stream(chat, chat_name, last_message_id, oldest_first):
+                    yielded = True
+                    yield msg_data
+
+            except INVALID_PEER_ERRORS as e:
+                # Only safe to retry if nothing has been handed out yet
+                if yielded:
+                    raise
+                logger.warning(f"Cached peer for {chat_id} rejected by Telegram ({e}) - refreshing")
+                self.entity_cache.invalidate(chat_id)
+                chat, chat_name = await self.entity_cache.resolve(chat_id)
+
+                async for msg_data in self._stream(chat, chat_name, last_message_id, oldest_first):
+                    yield msg_data
+
+        except Exception as e:
+            logger.error(f"Failed to fetch messages from {chat_id}: {e}")
+            raise
 
-                async for message in self.client.iter_messages(chat, reverse=False):
-                    if message.date < cutoff_time:
-                        break
+    async def iter_message_batches(
+        self,
+        chat_id: str,
+        last_message_id: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> AsyncIterator[List[MessageRecord]]:
+        """
+        Yield new messages from a chat in fixed-size batches.
 
-                    if message.message:  # Only text messages
-                        msg_data = self._extract_message_data(message, chat_name)
-                        messages.append(msg_data)
+        Args:
+            chat_id: Chat identifier (username, phone number, or ID)
+            last_message_id: Last processed message ID (None for initial run)
+            batch_size: Maximum number of messages per batch
 
-                logger.info(f"Initial fetch complete: {len(messages)} messages from {chat_name}")
+        Yields:
+            Lists of at most batch_size message records
+        """
+        batch = []
+        async for msg_data in self.stream_new_messages(chat_id, last_message_id):
+            batch.append(msg_data)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-            else:
-                # Subsequent execution: fetch messages after last_message_id
-                logger.info(f"Fetching messages after ID {last_message_id} from {chat_name}")
+        if batch:
+            yield batch
 
-                async for message in self.client.iter_messages(
-                    chat,
-                    min_id=last_message_id,
-                    reverse=False
-                ):
-                    # Skip the message with exactly last_message_id (already processed)
-                    if message.id == last_message_id:
-                        continue
+    async def _stream(
+        self,
+        chat,
+        chat_name: str,
+        last_message_id: Optional[int],
+        oldest_first: bool = False
+    ) -> AsyncIterator[MessageRecord]:
+        """
+        Yield messages from a resolved chat peer.
 
-                    if message.message:  # Only text messages
-                        msg_data = self._extract_message_data(message, chat_name)
-                        messages.append(msg_data)
+        Args:
+            chat: Resolved input peer
+            chat_name: Display name of the chat
+            last_message_id: Last processed message ID (None for initial run)
+            oldest_first: Read messages after last_message_id in ascending ID order
 
-                logger.info(f"Fetched {len(messages)} new messages from {chat_name}")
+        Yields:
+            Message records
+        """
+        count = 0
+
+        if last_message_id is None:
+            # Initial execution: seek to the window start and read forward,
+            # so the server skips everything older in a single request
+            cutoff_time = parse_fetch_window(self.initial_window)
+            logger.info(
+                f"Initial fetch for {chat_name} - retrieving messages since "
+                f"{cutoff_time.strftime('%Y-%m-%d %H:%M')} UTC ({self.initial_window})"
+            )
+            history = self.client.iter_messages(
+                chat,
+                offset_date=cutoff_time,
+                reverse=True
+            )
+        else:
+            # Subsequent execution: fetch messages after last_message_id
+            logger.info(f"Fetching messages after ID {last_message_id} from {chat_name}")
+            history = self.client.iter_messages(
+                chat,
+                min_id=last_message_id,
+                reverse=oldest_first
+            )
+
+        # Buffer one history page so its senders can be resolved in bulk
+        page = []
+        async for message in history:
+            # Skip the message with exactly last_message_id (already processed)
+            if message.id == last_message_id:
+                continue
+
+            if message.message:  # Only text messages
+                page.append(message)
+
+            if len(page) >= HISTORY_PAGE_SIZE:
+                for record in await self.extract_records(page, chat_name):
+                    count += 1
+                    yield record
+                page = []
+
+        if page:
+            for record in await self.extract_records(page, chat_name):
+                count += 1
+                yield record
+
+        if last_message_id is None:
+            logger.info(f"Initial fetch complete: {count} messages from {chat_name}")
+        else:
+            logger.info(f"Fetched {count} new messages from {chat_name}")
+
+    async def extract_records(self, page: List[Message], chat_name: str) -> List[MessageRecord]:
+        """
+        Resolve senders for a page of messages in bulk, then extract records.
 
-            return messages
+        Args:
+            page: Telethon messages (one history page, or live updates)
+            chat_name: Name of the chat
 
-        except Exception as e:
-            logger.error(f"Failed to fetch messages from {chat_id}: {e}")
-            raise
+        Returns:
+            List of message records
+        """
+        await self.sender_cache.prefetch(page)
+        return [self._extract_message_data(message, chat_name) for message in page]
 
-    def _extract_message_data(self, message: Message, chat_name: str) -> Dict:
+    def _extract_message_data(self, message: Message, chat_name: str) -> MessageRecord:
         """
         Extract relevant data from a Telegram message.
 
@@ -99,26 +271,21 @@ class MessageFetcher:
             chat_name: Name of the chat
 
         Returns:
-            Dictionary with message data
-        """
-        # Get sender information
-        sender_name = "Unknown"
-        if message.sender:
-            first_name = getattr(message.sender, "first_name", None) or ""
-            last_name = getattr(message.sender, "last_name", None) or ""
-            sender_name = (first_name + " " + last_name).strip()
-            if not sender_name:
-                sender_name = getattr(message.sender, "username", None) or "Unknown"
-
-        return {
-            "message_id": message.id,
-            "chat_id": message.chat_id,
-            "chat_name": chat_name,
-            "sender": sender_name,
-            "text": message.message,
-            "date": message.date.isoformat(),
-            "timestamp": int(message.date.timestamp()),
-        }
+            Compact message record
+        """
+        # Get sender information (resolved per page by the sender cache)
+        sender_name = self.sender_cache.name_for(message)
+        replies = getattr(message, "replies", None)
+
+        return MessageRecord(
+            message_id=message.id,
+            chat_id=message.chat_id,
+            chat_name=chat_name,
+            sender=sender_name,
+            text=message.message,
+            timestamp=int(message.date.timestamp()),
+            replies=replies.replies if replies else 0,
+        )
 
     async def get_latest_message_id(self, chat_id: str) -> Optional[int]:
         """
@@ -130,18 +297,18 @@ class MessageFetcher:
         Returns:
             Latest message ID or None if chat is empty
         """
-        try:
-            # Convert numeric chat_id to integer for group chats
-            entity_id = int(chat_id) if chat_id.lstrip('-').isdigit() else chat_id
-            chat = await self.client.get_entity(entity_id)
-
+        async def latest(chat, chat_name: str) -> Optional[int]:
             async for message in self.client.iter_messages(chat, limit=1):
-                logger.debug(f"Latest message ID in {chat_id}: {message.id}")
+                logger.debug(f"Latest message ID in {chat_name}: {message.id}")
                 return message.id
-
-            logger.warning(f"No messages found in {chat_id}")
             return None
 
+        try:
+            message_id = await self.entity_cache.with_peer(chat_id, latest)
+            if message_id is None:
+                logger.warning(f"No messages found in {chat_id}")
+            return message_id
+
         except Exception as e:
             logger.error(f"Failed to get latest message ID from {chat_id}: {e}")
             raise
@@ -4,6 +4,7 @@ from typing import Optional
 
 from telethon import TelegramClient
 
+from src.telegram_client.entity_cache import EntityCache
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,14 +13,20 @@ logger = get_logger(__name__)
 class MessageReader:
     """Handles marking Telegram messages as read."""
 
-    def __init__(self, telegram_client: TelegramClient):
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        entity_cache: Optional[EntityCache] = None
+    ):
         """
         Initialize MessageReader.
 
         Args:
             telegram_client: Connected Telethon TelegramClient instance
+            entity_cache: Shared entity cache (default: private in-memory cache)
         """
         self.client = telegram_client
+        self.entity_cache = entity_cache or EntityCache(telegram_client)
 
     async def mark_as_read(self, chat_id: str, max_message_id: Optional[int] = None) -> None:
         """
@@ -31,12 +38,7 @@ class MessageReader:
 
         This uses Telegram's send_read_acknowledge() method to mark messages as read.
         """
-        try:
-            # Get chat entity
-            chat = await self.client.get_entity(chat_id)
-            chat_name = getattr(chat, "title", None) or getattr(chat, "username", None) or str(chat_id)
-
-            # Send read acknowledgment
+        async def acknowledge(chat, chat_name: str) -> None:
             if max_message_id is not None:
                 await self.client.send_read_acknowledge(
                     chat,
@@ -47,6 +49,10 @@ class MessageReader:
                 await self.client.send_read_acknowledge(chat)
                 logger.info(f"Marked all messages as read in {chat_name}")
 
+        try:
+            # Resolve through the shared cache and send read acknowledgment
+            await self.entity_cache.with_peer(chat_id, acknowledge)
+
         except Exception as e:
             logger.error(f"Failed to mark messages as read in {chat_id}: {e}")
             raise
@@ -0,0 +1,115 @@
+"""Compact message record shared by the fetcher, filters and AI organizer."""
+
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute: int) -> str:
+    """Format a UTC minute bucket (timestamp // 60) as 'YYYY-MM-DD HH:MM'."""
+    return datetime.fromtimestamp(minute * 60, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def format_timestamp(timestamp: int) -> str:
+    """
+    Format a Unix timestamp as a UTC 'YYYY-MM-DD HH:MM' string.
+
+    Results are cached per minute, so messages sent in the same minute
+    share one formatted string.
+
+    Args:
+        timestamp: Unix timestamp in seconds
+
+    Returns:
+        Formatted date string
+    """
+    return _format_minute(timestamp // 60)
+
+
+class MessageRecord:
+    """
+    A single Telegram message with the metadata the pipeline needs.
+
+    Uses __slots__ to keep per-message memory small. The date is stored
+    only as an integer timestamp, and chat and sender names are interned
+    so repeated names share one string object.
+    """
+
+    __slots__ = ("message_id", "chat_id", "chat_name", "sender", "text", "timestamp", "also_in", "replies")
+
+    def __init__(
+        self,
+        message_id: int,
+        chat_id: Optional[int],
+        chat_name: str,
+        sender: str,
+        text: str,
+        timestamp: int,
+        also_in: Tuple[str, ...] = (),
+        replies: int = 0
+    ):
+        """
+        Initialize MessageRecord.
+
+        Args:
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            chat_name: Display name of the chat
+            sender: Display name of the sender
+            text: Message text
+            timestamp: Send time as a Unix timestamp (seconds, UTC)
+            also_in: Other chats the same message was posted in (set by deduplication)
+            replies: Number of replies (comments) the message received
+        """
+        self.message_id = message_id
+        self.chat_id = chat_id
+        self.chat_name = sys.intern(chat_name)
+        self.sender = sys.intern(sender)
+        self.text = text
+        self.timestamp = timestamp
+        self.also_in = also_in
+        self.replies = replies
+
+    @property
+    def source_chats(self) -> str:
+        """Chat name, followed by any other chats the message also appeared in."""
+        if not self.also_in:
+            return self.chat_name
+        return f"{self.chat_name} (+ {', '.join(self.also_in)})"
+
+    @property
+    def date(self) -> datetime:
+        """Send time as a timezone-aware UTC datetime."""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+    @property
+    def formatted_date(self) -> str:
+        """Send time formatted as 'YYYY-MM-DD HH:MM' (UTC)."""
+        return format_timestamp(self.timestamp)
+
+    def to_dict(self) -> Dict:
+        """
+        Convert the record to the legacy message dictionary format.
+
+        Returns:
+            Dictionary with message data
+        """
+        return {
+            "message_id": self.message_id,
+            "chat_id": self.chat_id,
+            "chat_name": self.chat_name,
+            "sender": self.sender,
+            "text": self.text,
+            "date": self.date.isoformat(),
+            "timestamp": self.timestamp,
+            "also_in": list(self.also_in),
+            "replies": self.replies,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"MessageRecord(chat={self.chat_name!r}, id={self.message_id}, "
+            f"sender={self.sender!r}, date={self.formatted_date})"
+        )
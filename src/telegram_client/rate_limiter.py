@@ -0,0 +1,281 @@
+"""FloodWait-aware rate limiting for Telethon API calls."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default (requests per second, burst capacity) for each wrapped method
+DEFAULT_RATES: Dict[str, Tuple[float, int]] = {
+    "get_entity": (5.0, 5),
+    "iter_messages": (3.0, 5),
+    "send_read_acknowledge": (2.0, 3),
+    "invoke": (3.0, 3),
+}
+
+# Telegram returns at most 100 messages per history request
+HISTORY_PAGE_SIZE = 100
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate of one API method."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize TokenBucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def take(self) -> None:
+        """Wait until a token is available (and any flood penalty has expired), then consume it."""
+        while True:
+            now = time.monotonic()
+
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds.
+
+        Args:
+            seconds: Server-provided flood wait
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that halves on flood waits and recovers gradually.
+
+    The limit grows by one after a run of successful calls, up to max_limit.
+    """
+
+    def __init__(self, max_limit: int, recover_after: int = 20):
+        """
+        Initialize AdaptiveConcurrency.
+
+        Args:
+            max_limit: Maximum number of calls in flight
+            recover_after: Successful calls needed (per slot) before the limit grows
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.recover_after = recover_after
+        self._in_use = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+    async def release(self) -> None:
+        """Release a slot."""
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        """Record a successful call, growing the limit after enough successes."""
+        self._successes += 1
+        if self.limit < self.max_limit and self._successes >= self.limit * self.recover_after:
+            self.limit += 1
+            self._successes = 0
+            logger.debug(f"Telegram concurrency limit raised to {self.limit}")
+
+    def on_flood(self) -> None:
+        """Halve the limit after a flood wait."""
+        self._successes = 0
+        if self.limit > 1:
+            self.limit = max(1, self.limit // 2)
+            logger.info(f"Telegram concurrency limit lowered to {self.limit}")
+
+
+class RateLimitedClient:
+    """
+    Wraps a Telethon client so every API call goes through the rate limiter.
+
+    get_entity, iter_messages, send_read_acknowledge and raw requests
+    (client(request)) each use their own token bucket. A FloodWaitError
+    blocks that method's bucket for the server-provided time, halves the
+    shared concurrency limit and retries the call. Other attributes are
+    passed through to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        max_concurrency: int = 5,
+        rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        max_flood_wait: int = 300,
+        max_flood_retries: int = 3
+    ):
+        """
+        Initialize RateLimitedClient.
+
+        Args:
+            telegram_client: Telethon TelegramClient instance
+            max_concurrency: Maximum number of API calls in flight
+            rates: Per-method (requests per second, burst) overrides
+            max_flood_wait: Longest flood wait (seconds) to sleep through before giving up
+            max_flood_retries: Maximum retries per call after flood waits
+        """
+        self.client = telegram_client
+        self.max_flood_wait = max_flood_wait
+        self.max_flood_retries = max_flood_retries
+
+        # Surface every flood wait to us instead of Telethon sleeping silently
+        self.client.flood_sleep_threshold = 0
+
+        merged_rates = dict(DEFAULT_RATES)
+        merged_rates.update(rates or {})
+        self.buckets = {
+            method: TokenBucket(rate, capacity)
+            for method, (rate, capacity) in merged_rates.items()
+        }
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+
+        self.flood_count = 0
+        self.flood_wait_seconds = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    async def get_entity(self, entity: Any) -> Any:
+        """Rate-limited client.get_entity()."""
+        return await self._call("get_entity", lambda: self.client.get_entity(entity))
+
+    async def send_read_acknowledge(self, entity: Any, **kwargs) -> Any:
+        """Rate-limited client.send_read_acknowledge()."""
+        return await self._call(
+            "send_read_acknowledge",
+            lambda: self.client.send_read_acknowledge(entity, **kwargs)
+        )
+
+    async def __call__(self, request: Any) -> Any:
+        """Rate-limited raw request invocation."""
+        return await self._call("invoke", lambda: self.client(request))
+
+    async def iter_messages(self, entity: Any, **kwargs) -> AsyncIterator[Any]:
+        """
+        Rate-limited client.iter_messages().
+
+        One token is charged per history page. After a flood wait the
+        iteration resumes from the last message yielded, so nothing is
+        repeated or skipped.
+        """
+        last_id: Optional[int] = None
+        count = 0
+        floods = 0
+
+        while True:
+            call_kwargs = dict(kwargs)
+            if last_id is not None:
+                # Resume after the last message handed out (direction follows reverse)
+                call_kwargs.pop("offset_date", None)
+                call_kwargs["offset_id"] = last_id
+                if call_kwargs.get("limit") is not None:
+                    call_kwargs["limit"] -= count
+
+            iterator = self.client.iter_messages(entity, **call_kwargs).__aiter__()
+            page_count = 0
+
+            try:
+                while True:
+                    charge = page_count % HISTORY_PAGE_SIZE == 0
+                    message = await self._call(
+                        "iter_messages",
+                        iterator.__anext__,
+                        charge=charge,
+                        retry=False
+                    )
+                    page_count += 1
+                    count += 1
+                    last_id = message.id
+                    yield message
+
+            except StopAsyncIteration:
+                return
+
+            except FloodWaitError as e:
+                # _call already penalised the bucket; wait and resume
+                floods += 1
+                if e.seconds > self.max_flood_wait or floods > self.max_flood_retries:
+                    raise
+                await asyncio.sleep(e.seconds)
+
+    async def _call(
+        self,
+        method: str,
+        operation: Callable[[], Awaitable[Any]],
+        charge: bool = True,
+        retry: bool = True
+    ) -> Any:
+        """
+        Run one API call under the method's bucket and the concurrency limit.
+
+        Args:
+            method: Bucket name
+            operation: Zero-argument callable returning the call's awaitable
+            charge: Whether to consume a token for this call
+            retry: Whether to sleep and retry after a flood wait
+
+        Returns:
+            Result of the call
+        """
+        bucket = self.buckets[method]
+
+        for attempt in range(self.max_flood_retries + 1):
+            if charge:
+                await bucket.take()
+
+            await self.concurrency.acquire()
+            try:
+                result = await operation()
+                self.concurrency.on_success()
+                return result
+
+            except FloodWaitError as e:
+                wait_seconds = e.seconds
+                self.flood_count += 1
+                self.flood_wait_seconds += wait_seconds
+                bucket.block_for(wait_seconds)
+                self.concurrency.on_flood()
+                logger.warning(f"Telegram flood wait on {method}: {wait_seconds}s")
+
+                if not retry or wait_seconds > self.max_flood_wait or attempt == self.max_flood_retries:
+                    raise
+
+            finally:
+                await self.concurrency.release()
+
+            await asyncio.sleep(wait_seconds)
+            charge = True
@@ -0,0 +1,337 @@
+"""Offline stand-in for the Telethon client, for benchmarks and regression runs.
+
+ReplayTelegramClient implements the parts of Telethon this project uses
+(get_entity, iter_messages, send_read_acknowledge and GetPeerDialogsRequest)
+on top of recorded or synthetically generated chat histories, with
+configurable latency, page size and flood-wait injection.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from telethon import TelegramClient, utils
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.messages import GetPeerDialogsRequest
+from telethon.tl.types import (
+    Channel,
+    ChatPhotoEmpty,
+    InputPeerChannel,
+    InputPeerUser,
+    PeerChannel,
+    User,
+)
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReplayMessage:
+    """Minimal message object with the attributes MessageFetcher reads."""
+
+    __slots__ = ("id", "date", "message", "chat_id", "sender_id", "sender", "input_sender")
+
+    def __init__(self, id: int, date: datetime, message: str, chat_id: int, sender: User):
+        self.id = id
+        self.date = date
+        self.message = message
+        self.chat_id = chat_id
+        self.sender_id = sender.id
+        self.sender = sender
+        self.input_sender = utils.get_input_peer(sender)
+
+
+class ReplayTelegramClient:
+    """
+    Telethon-compatible client serving chat histories from memory.
+
+    Histories are a mapping of chat key (username or numeric ID string) to
+    a dictionary with "title" and "messages", where each message is
+    {"id", "date" (ISO), "sender", "text"} in ascending ID order.
+    """
+
+    def __init__(
+        self,
+        histories: Dict[str, Dict],
+        latency: float = 0.0,
+        page_size: int = 100,
+        flood_rate: float = 0.0,
+        flood_seconds: int = 1,
+        seed: int = 0
+    ):
+        """
+        Initialize ReplayTelegramClient.
+
+        Args:
+            histories: Chat histories keyed by chat key
+            latency: Simulated round-trip time per request (seconds)
+            page_size: Messages returned per history request
+            flood_rate: Probability that a request raises FloodWaitError
+            flood_seconds: Wait carried by injected flood errors
+            seed: Random seed for flood injection
+        """
+        self.latency = latency
+        self.page_size = page_size
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self.flood_sleep_threshold = 60
+        self._random = random.Random(seed)
+
+        self.request_counts: Dict[str, int] = {}
+        self.read_acks: Dict[int, Optional[int]] = {}
+
+        self._channels: Dict[int, Channel] = {}
+        self._keys: Dict[str, int] = {}
+        self._users: Dict[int, User] = {}
+        self._messages: Dict[int, List[ReplayMessage]] = {}
+
+        self._load(histories)
+
+    def _load(self, histories: Dict[str, Dict]) -> None:
+        """Build entities and message objects from history dictionaries."""
+        user_ids: Dict[str, int] = {}
+
+        for index, (key, history) in enumerate(histories.items(), 1):
+            channel_id = int(key) if key.lstrip("-").isdigit() else 1_000_000 + index
+            channel = Channel(
+                id=abs(channel_id),
+                title=history.get("title", key),
+                photo=ChatPhotoEmpty(),
+                date=None,
+                access_hash=abs(channel_id) * 7 + 1,
+                username=None if key.lstrip("-").isdigit() else key,
+            )
+            self._channels[channel.id] = channel
+            self._keys[key] = channel.id
+            marked_id = utils.get_peer_id(PeerChannel(channel.id))
+
+            messages = []
+            for raw in history.get("messages", []):
+                name = raw.get("sender", "Unknown")
+                if name not in user_ids:
+                    user_ids[name] = len(user_ids) + 1
+                    first, _, last = name.partition(" ")
+                    self._users[user_ids[name]] = User(
+                        id=user_ids[name],
+                        access_hash=user_ids[name] * 11 + 1,
+                        first_name=first,
+                        last_name=last or None,
+                    )
+
+                messages.append(ReplayMessage(
+                    id=raw["id"],
+                    date=datetime.fromisoformat(raw["date"]),
+                    message=raw.get("text", ""),
+                    chat_id=marked_id,
+                    sender=self._users[user_ids[name]],
+                ))
+
+            self._messages[channel.id] = messages
+
+    @property
+    def chat_keys(self) -> List[str]:
+        """Chat keys in history order (usable as chat_id in chat configs)."""
+        return list(self._keys)
+
+    @classmethod
+    def synthetic(
+        cls,
+        chats: int = 10,
+        messages_per_chat: int = 1000,
+        senders_per_chat: int = 20,
+        span_hours: int = 24,
+        seed: int = 0,
+        **kwargs
+    ) -> "ReplayTelegramClient":
+        """
+        Create a client with generated histories.
+
+        Args:
+            chats: Number of chats (keys "chat0", "chat1", ...)
+            messages_per_chat: Messages per chat, spread evenly over span_hours
+            senders_per_chat: Distinct senders per chat
+            span_hours: Time span covered by each history, ending now
+            seed: Random seed for message content
+            **kwargs: Passed to the constructor (latency, page_size, flood_rate, ...)
+
+        Returns:
+            ReplayTelegramClient instance
+        """
+        rng = random.Random(seed)
+        words = ["market", "token", "airdrop", "update", "launch", "price", "chain",
+                 "wallet", "bridge", "listing", "gm", "thanks", "news", "staking"]
+        end = datetime.now(timezone.utc)
+        step = timedelta(hours=span_hours) / max(1, messages_per_chat)
+
+        histories = {}
+        for c in range(chats):
+            start = end - timedelta(hours=span_hours)
+            histories[f"chat{c}"] = {
+                "title": f"Chat {c}",
+                "messages": [
+                    {
+                        "id": i,
+                        "date": (start + step * i).isoformat(),
+                        "sender": f"User{c}_{rng.randrange(senders_per_chat)}",
+                        "text": " ".join(rng.choice(words) for _ in range(rng.randint(1, 30))),
+                    }
+                    for i in range(1, messages_per_chat + 1)
+                ],
+            }
+
+        return cls(histories, seed=seed, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayTelegramClient":
+        """
+        Create a client from a JSON file written by record_histories().
+
+        Args:
+            path: Path to the recording
+            **kwargs: Passed to the constructor
+
+        Returns:
+            ReplayTelegramClient instance
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    async def _request(self, method: str) -> None:
+        """Account for one simulated round trip (latency and flood injection)."""
+        self.request_counts[method] = self.request_counts.get(method, 0) + 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.flood_rate and self._random.random() < self.flood_rate:
+            raise FloodWaitError(request=None, capture=self.flood_seconds)
+
+    def _channel_for(self, entity: Any) -> Channel:
+        """Find the channel for a key, ID, peer or entity."""
+        if isinstance(entity, (Channel, InputPeerChannel, PeerChannel)):
+            channel_id = getattr(entity, "channel_id", None) or entity.id
+        elif isinstance(entity, int):
+            channel_id = utils.resolve_id(entity)[0]
+        else:
+            channel_id = self._keys.get(str(entity).lstrip("@"))
+
+        if channel_id not in self._channels:
+            raise ValueError(f"Cannot find any entity corresponding to \"{entity}\"")
+        return self._channels[channel_id]
+
+    async def get_entity(self, entity: Any) -> Any:
+        """Resolve a chat key/ID/peer, or a list of user peers."""
+        await self._request("get_entity")
+
+        if isinstance(entity, list):
+            return [
+                self._users[e.user_id] if isinstance(e, InputPeerUser) else self._channel_for(e)
+                for e in entity
+            ]
+        return self._channel_for(entity)
+
+    async def send_read_acknowledge(self, entity: Any, max_id: Optional[int] = None, **kwargs) -> bool:
+        """Record a read acknowledgment."""
+        await self._request("send_read_acknowledge")
+        self.read_acks[self._channel_for(entity).id] = max_id
+        return True
+
+    async def __call__(self, request: Any) -> Any:
+        """Serve GetPeerDialogsRequest (other raw requests are not supported)."""
+        await self._request("invoke")
+
+        if not isinstance(request, GetPeerDialogsRequest):
+            raise NotImplementedError(f"ReplayTelegramClient does not support {type(request).__name__}")
+
+        dialogs = []
+        for dialog_peer in request.peers:
+            channel = self._channel_for(dialog_peer.peer)
+            messages = self._messages[channel.id]
+            top_message = messages[-1].id if messages else 0
+            dialogs.append(SimpleNamespace(
+                peer=PeerChannel(channel.id),
+                top_message=top_message,
+                unread_count=max(0, top_message - (self.read_acks.get(channel.id) or 0)),
+            ))
+        return SimpleNamespace(dialogs=dialogs)
+
+    async def iter_messages(
+        self,
+        entity: Any,
+        limit: Optional[int] = None,
+        offset_date: Optional[datetime] = None,
+        offset_id: int = 0,
+        min_id: int = 0,
+        max_id: int = 0,
+        reverse: bool = False,
+        **kwargs
+    ) -> AsyncIterator[ReplayMessage]:
+        """Yield messages with Telethon's filtering and ordering semantics, one page per request."""
+        messages = self._messages[self._channel_for(entity).id]
+
+        selected = [
+            m for m in messages
+            if m.id > min_id
+            and (not max_id or m.id < max_id)
+            and (not offset_id or (m.id > offset_id if reverse else m.id < offset_id))
+            and (offset_date is None or (m.date > offset_date if reverse else m.date < offset_date))
+        ]
+        if not reverse:
+            selected.reverse()
+        if limit is not None:
+            selected = selected[:limit]
+
+        for start in range(0, len(selected), self.page_size):
+            await self._request("iter_messages")
+            for message in selected[start:start + self.page_size]:
+                yield message
+
+        if not selected:
+            await self._request("iter_messages")
+
+
+async def record_histories(
+    client: TelegramClient,
+    chat_ids: List[str],
+    path: str,
+    limit: int = 1000
+) -> None:
+    """
+    Record recent history from live Telegram for later replay.
+
+    Args:
+        client: Connected Telethon client
+        chat_ids: Chat identifiers to record
+        path: Output JSON path
+        limit: Maximum messages recorded per chat
+    """
+    from src.telegram_client.entity_cache import to_entity_id
+    from src.telegram_client.sender_cache import display_name
+
+    histories = {}
+    for chat_id in chat_ids:
+        chat = await client.get_entity(to_entity_id(chat_id))
+        messages = []
+        async for message in client.iter_messages(chat, limit=limit):
+            if message.message:
+                messages.append({
+                    "id": message.id,
+                    "date": message.date.isoformat(),
+                    "sender": display_name(message.sender) if message.sender else "Unknown",
+                    "text": message.message,
+                })
+        messages.reverse()
+        histories[str(chat_id)] = {
+            "title": getattr(chat, "title", None) or str(chat_id),
+            "messages": messages,
+        }
+        logger.info(f"Recorded {len(messages)} messages from {chat_id}")
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(histories, f, ensure_ascii=False)
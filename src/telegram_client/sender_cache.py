@@ -0,0 +1,135 @@
+"""Sender name cache for resolving message senders in bulk."""
+
+from typing import Dict, Iterable, Optional
+
+from telethon import TelegramClient
+from telethon.tl.types import Message
+
+from src.storage.state_manager import StateManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def display_name(entity) -> str:
+    """
+    Build a display name for a sender entity.
+
+    Args:
+        entity: Telethon User or Channel entity
+
+    Returns:
+        "First Last", falling back to the username, then "Unknown"
+    """
+    first_name = getattr(entity, "first_name", None) or ""
+    last_name = getattr(entity, "last_name", None) or ""
+    name = (first_name + " " + last_name).strip()
+    if not name:
+        name = getattr(entity, "username", None) or "Unknown"
+    return name
+
+
+class SenderCache:
+    """
+    Caches sender display names by user ID, in memory and in SQLite.
+
+    Senders are resolved once per history page rather than once per message.
+    Names stored in SQLite are reused across runs until they exceed the TTL.
+    """
+
+    def __init__(
+        self,
+        telegram_client: TelegramClient,
+        state_manager: Optional[StateManager] = None,
+        ttl_hours: int = 24
+    ):
+        """
+        Initialize SenderCache.
+
+        Args:
+            telegram_client: Connected Telethon TelegramClient instance
+            state_manager: State manager for persistent caching (None = memory only)
+            ttl_hours: Maximum age of persisted names before they are refreshed
+        """
+        self.client = telegram_client
+        self.state_manager = state_manager
+        self.ttl_hours = ttl_hours
+        self._names: Dict[int, str] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    async def prefetch(self, messages: Iterable[Message]) -> None:
+        """
+        Resolve the senders of a page of messages in bulk.
+
+        Names are taken from the in-memory cache, then from SQLite in one
+        query, then from the sender entities Telegram already returned with
+        the page. Only senders still missing after that are fetched, in a
+        single get_entity() call.
+
+        Args:
+            messages: Telethon messages from one history page
+        """
+        page_senders: Dict[int, Message] = {}
+        for message in messages:
+            if message.sender_id is not None:
+                page_senders.setdefault(message.sender_id, message)
+
+        senders: Dict[int, Message] = {}
+        for sender_id, message in page_senders.items():
+            if sender_id in self._names:
+                self.hits += 1
+            else:
+                senders[sender_id] = message
+
+        if not senders:
+            return
+
+        # Persistent cache: one query for the whole page
+        if self.state_manager is not None:
+            stored = self.state_manager.get_cached_senders(list(senders), self.ttl_hours)
+            self.hits += len(stored)
+            self._names.update(stored)
+            for sender_id in stored:
+                senders.pop(sender_id)
+
+        if not senders:
+            return
+
+        self.misses += len(senders)
+        resolved: Dict[int, str] = {}
+        unresolved = []
+
+        for sender_id, message in senders.items():
+            if message.sender is not None:
+                resolved[sender_id] = display_name(message.sender)
+            elif message.input_sender is not None:
+                unresolved.append((sender_id, message.input_sender))
+
+        if unresolved:
+            try:
+                entities = await self.client.get_entity([peer for _, peer in unresolved])
+                for (sender_id, _), entity in zip(unresolved, entities):
+                    resolved[sender_id] = display_name(entity)
+            except Exception as e:
+                logger.warning(f"Bulk sender lookup failed for {len(unresolved)} sender(s): {e}")
+
+        self._names.update(resolved)
+        if self.state_manager is not None and resolved:
+            self.state_manager.save_cached_senders(resolved)
+
+    def name_for(self, message: Message) -> str:
+        """
+        Get the display name for a message's sender.
+
+        Args:
+            message: Telethon message whose page has been prefetched
+
+        Returns:
+            Sender display name ("Unknown" if it could not be resolved)
+        """
+        name = self._names.get(message.sender_id)
+        if name is None and message.sender is not None:
+            name = display_name(message.sender)
+        return name or "Unknown"